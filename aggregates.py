@@ -0,0 +1,516 @@
+"""
+Pre-aggregated summaries of the review table.
+
+The metric cube holds, for every (Year, Country) cell and rating metric,
+the sum, non-null count and sum of squares, plus the number of reviews in
+the cell. Any slider / multiselect combination is answered by reducing
+only the selected cells, so per-interaction cost scales with
+years x countries instead of with the number of reviews.
+"""
+
+import numpy as np
+import pandas as pd
+
+CELL_KEYS = ["Year", "Country"]
+
+
+# ------------------------------------
+# Metric cube
+# ------------------------------------
+def build_metric_cube(df, metrics, keys=None):
+    """Sum / count / sum-of-squares of each metric per (Year, Country)."""
+    values = df[metrics].astype("float64")
+    if keys is None:
+        keys = [df[k] for k in CELL_KEYS]
+
+    grouped = values.groupby(keys, observed=True)
+    cube = pd.concat(
+        {
+            "sum": grouped.sum(),
+            "count": grouped.count(),
+            "sumsq": (values ** 2).groupby(keys, observed=True).sum(),
+            "rows": grouped.size().to_frame("reviews"),
+        },
+        axis=1,
+    )
+    cube.index = _plain_cells(cube.index)
+    return cube
+
+
+def _plain_cells(index):
+    # Categorical levels differ between chunks / datasets; plain labels
+    # keep cells from different sources mergeable.
+    return pd.MultiIndex.from_tuples(
+        [tuple(cell) for cell in index], names=list(index.names)
+    )
+
+
+def merge_metric_cubes(a, b):
+    """Cube of the union of two disjoint sets of reviews."""
+    # Cells only one side has come back as floats: keep the counts integers
+    return a.add(b, fill_value=0).astype(a.dtypes).sort_index()
+
+
+def _cell_mask(index, year_range, countries):
+    years = index.get_level_values("Year")
+    return (
+        (years >= year_range[0])
+        & (years <= year_range[1])
+        & index.get_level_values("Country").isin(list(countries))
+    )
+
+
+def select_cells(cube, year_range, countries):
+    """Cells of the cube that fall inside the sidebar filters."""
+    return cube[_cell_mask(cube.index, year_range, countries)]
+
+
+def reduce_cells(cells, metrics, by):
+    """Collapse cells to per-`by` count, mean and sample std of each metric."""
+    totals = cells.groupby(level=by, observed=True).sum()
+
+    n = totals["count"][metrics]
+    s = totals["sum"][metrics]
+    ss = totals["sumsq"][metrics]
+
+    mean = s / n.where(n > 0)
+    var = (ss - s * mean) / (n - 1).where(n > 1)
+    std = np.sqrt(var.clip(lower=0))
+
+    return pd.concat({"count": n, "mean": mean, "std": std}, axis=1)
+
+
+def yearly_means(cube, year_range, countries, metrics):
+    """Equivalent of ``filtered_df.groupby("Year")[metrics].mean()``."""
+    cells = select_cells(cube, year_range, countries)
+    if not len(metrics):
+        # One row per year and no columns, as pandas gives for [[]]
+        years = cells.index.get_level_values("Year").unique().sort_values()
+        return pd.DataFrame(index=years)
+    return reduce_cells(cells, metrics, "Year")["mean"]
+
+
+def country_review_counts(cube, year_range, countries):
+    """Number of reviews per country under the current filters."""
+    cells = select_cells(cube, year_range, countries)
+    return (
+        cells["rows"]["reviews"]
+        .groupby(level="Country", observed=True)
+        .sum()
+    )
+
+
+# ------------------------------------
+# Sub-year time index
+# ------------------------------------
+# The same cube layout keyed by (Period, Country), where Period is the
+# start of the calendar month or week the review was written in. Dates
+# are parsed once at ingestion, so no rerun touches the raw strings.
+TIME_FREQS = {"Monthly": "M", "Weekly": "W"}
+
+
+def build_time_index(df, metrics, freq):
+    """Metric cube per (period start, Country) for a pandas period `freq`."""
+    dated = df[df["Date"].notna()]
+    period = dated["Date"].dt.to_period(freq).dt.start_time.rename("Period")
+    return build_metric_cube(dated, metrics, keys=[period, dated["Country"]])
+
+
+def select_periods(time_index, year_range, countries):
+    """Cells of a time index that fall inside the sidebar filters."""
+    periods = time_index.index.get_level_values("Period")
+    return time_index[
+        (periods.year >= year_range[0])
+        & (periods.year <= year_range[1])
+        & time_index.index.get_level_values("Country").isin(list(countries))
+    ]
+
+
+def period_means(time_index, year_range, countries, metric):
+    """Mean of `metric` per (Period, Country) inside the filters."""
+    cells = select_periods(time_index, year_range, countries)
+    return reduce_cells(cells, [metric], ["Period", "Country"])["mean"].reset_index()
+
+
+def calendar_means(time_index, year_range, countries, metric):
+    """Year x month grid of the mean of `metric` over the selected countries."""
+    cells = select_periods(time_index, year_range, countries)
+    by_period = reduce_cells(cells, [metric], "Period")["mean"][metric]
+    grid = pd.DataFrame({
+        "Year": by_period.index.year,
+        "Month": by_period.index.month,
+        metric: by_period.to_numpy(),
+    })
+    return (
+        grid.pivot_table(index="Year", columns="Month", values=metric)
+        .reindex(columns=range(1, 13))
+    )
+
+
+# ------------------------------------
+# Correlation sufficient statistics
+# ------------------------------------
+# For every (Year, Country) cell we keep four k x k matrices over the
+# pairwise-complete rows of each metric pair (i, j):
+#
+#     n[i, j]    number of rows where both i and j are present
+#     sx[i, j]   sum of metric i over those rows     (sy = sx.T)
+#     sxy[i, j]  sum of i * j over those rows
+#     sxx[i, j]  sum of i ** 2 over those rows       (syy = sxx.T)
+#
+# Summing them over cells and applying the Pearson formula reproduces
+# DataFrame.corr() (which also uses pairwise-complete observations).
+
+
+def pairwise_stats(values):
+    """Stacked (4, k, k) sufficient statistics of a 2-D float array."""
+    present = ~np.isnan(values)
+    x = np.where(present, values, 0.0)
+    m = present.astype("float64")
+    return np.stack([m.T @ m, x.T @ m, x.T @ x, (x * x).T @ m])
+
+
+def build_corr_stats(df, metrics):
+    """Pairwise sufficient statistics per (Year, Country) cell."""
+    values = df[metrics].to_numpy(dtype="float64", na_value=np.nan)
+    groups = df.groupby(CELL_KEYS, observed=True).indices
+    return {
+        "metrics": list(metrics),
+        "cells": {key: pairwise_stats(values[idx]) for key, idx in groups.items()},
+    }
+
+
+def merge_corr_stats(a, b):
+    """Statistics of the union of two disjoint sets of reviews."""
+    cells = dict(a["cells"])
+    for key, stats in b["cells"].items():
+        cells[key] = cells[key] + stats if key in cells else stats
+    return {"metrics": a["metrics"], "cells": cells}
+
+
+def corr_from_stats(corr_stats, year_range, countries, metrics):
+    """Pearson correlation of `metrics` over the selected cells."""
+    pos = [corr_stats["metrics"].index(m) for m in metrics]
+    countries = set(countries)
+
+    total = np.zeros((4, len(pos), len(pos)))
+    for (year, country), stats in corr_stats["cells"].items():
+        if year_range[0] <= year <= year_range[1] and country in countries:
+            total += stats[:, pos][:, :, pos]
+
+    n, sx, sxy, sxx = total
+    sy, syy = sx.T, sxx.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+    corr = np.clip(corr, -1.0, 1.0)
+
+    return pd.DataFrame(corr, index=list(metrics), columns=list(metrics))
+
+
+# ------------------------------------
+# Categorical cross-tabulation
+# ------------------------------------
+# Every categorical variable is integer-coded once, and review counts are
+# kept as dense tensors indexed by code:
+#
+#     single[col]         (years, countries, levels of col)
+#     pairs[(a, b)]       (years, countries, levels of a, levels of b)
+#
+# Value counts, counts over time and any two-way cross-tab under any
+# (Year, Country) filter are then sums over array slices. Missing values
+# are a level of their own, so every marginal is exact; queries drop it.
+CATEGORY_COLS = [
+    "CEO Approval",
+    "Recommended",
+    "Business Outlook",
+    "Employment",
+    "Position",
+]
+EMPLOYMENT_COLS = ["Current employee", "Former employee"]
+MISSING = "(missing)"
+
+
+def category_frame(df):
+    """The categorical variables of `df` as string arrays (NaN -> MISSING).
+
+    Employment (Current / Former) is derived from the two boolean columns.
+    """
+    frame = {}
+    for col in CATEGORY_COLS:
+        if col == "Employment" and all(c in df.columns for c in EMPLOYMENT_COLS):
+            current = df["Current employee"].fillna(False).to_numpy(dtype=bool)
+            former = df["Former employee"].fillna(False).to_numpy(dtype=bool)
+            frame[col] = np.where(current, "Current", np.where(former, "Former", MISSING))
+        elif col in df.columns:
+            values = df[col].astype(object)
+            frame[col] = values.where(values.notna(), MISSING).astype(str).to_numpy()
+    return frame
+
+
+def _codes(values):
+    levels, codes = np.unique(values, return_inverse=True)
+    return levels, codes.ravel()
+
+
+def _bincount(flat, shape):
+    return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+
+def build_category_counts(df):
+    """Count tensors of every categorical variable and pair of variables."""
+    years, year_codes = _codes(df["Year"].to_numpy())
+    countries, country_codes = _codes(df["Country"].astype(str).to_numpy())
+    cell = year_codes * len(countries) + country_codes
+
+    frame = category_frame(df)
+    levels, codes = {}, {}
+    for col, values in frame.items():
+        levels[col], codes[col] = _codes(values)
+
+    cells = (len(years), len(countries))
+    single = {
+        col: _bincount(cell * len(levels[col]) + codes[col], cells + (len(levels[col]),))
+        for col in frame
+    }
+    pairs = {}
+    columns = list(frame)
+    for i, a in enumerate(columns):
+        for b in columns[i + 1:]:
+            ka, kb = len(levels[a]), len(levels[b])
+            flat = (cell * ka + codes[a]) * kb + codes[b]
+            pairs[(a, b)] = _bincount(flat, cells + (ka, kb))
+
+    return {
+        "years": years,
+        "countries": countries,
+        "levels": levels,
+        "single": single,
+        "pairs": pairs,
+    }
+
+
+def _expand(tensor, old_axes, new_axes):
+    # Place `tensor` into zeros laid out along the (superset) new axes
+    out = np.zeros(tuple(len(a) for a in new_axes), dtype=tensor.dtype)
+    index = np.ix_(*[np.searchsorted(new, old) for old, new in zip(old_axes, new_axes)])
+    out[index] = tensor
+    return out
+
+
+def _tensor_axes(counts, cols):
+    return [counts["years"], counts["countries"]] + [counts["levels"][c] for c in cols]
+
+
+def merge_category_counts(a, b):
+    """Count tensors of the union of two disjoint sets of reviews."""
+    merged = {
+        "years": np.union1d(a["years"], b["years"]),
+        "countries": np.union1d(a["countries"], b["countries"]),
+        "levels": {
+            col: np.union1d(a["levels"][col], b["levels"][col]) for col in a["levels"]
+        },
+    }
+
+    def add(tensor_a, tensor_b, cols):
+        axes = _tensor_axes(merged, cols)
+        return (
+            _expand(tensor_a, _tensor_axes(a, cols), axes)
+            + _expand(tensor_b, _tensor_axes(b, cols), axes)
+        )
+
+    merged["single"] = {
+        col: add(a["single"][col], b["single"][col], [col]) for col in a["single"]
+    }
+    merged["pairs"] = {
+        pair: add(a["pairs"][pair], b["pairs"][pair], pair) for pair in a["pairs"]
+    }
+    return merged
+
+
+def _select_cells(counts, year_range, countries):
+    years = counts["years"]
+    return (
+        (years >= year_range[0]) & (years <= year_range[1]),
+        np.isin(counts["countries"], list(countries)),
+    )
+
+
+def category_counts(counts, year_range, countries, column):
+    """Equivalent of ``filtered_df[column].value_counts()``."""
+    year_mask, country_mask = _select_cells(counts, year_range, countries)
+    totals = counts["single"][column][year_mask][:, country_mask].sum(axis=(0, 1))
+    series = pd.Series(totals, index=counts["levels"][column], name="count")
+    series = series.drop(MISSING, errors="ignore")
+    return series[series > 0].sort_values(ascending=False)
+
+
+def category_counts_by_year(counts, year_range, countries, column):
+    """Reviews per Year (rows) and level of `column` (columns)."""
+    year_mask, country_mask = _select_cells(counts, year_range, countries)
+    totals = counts["single"][column][year_mask][:, country_mask].sum(axis=1)
+    frame = pd.DataFrame(
+        totals,
+        index=pd.Index(counts["years"][year_mask], name="Year"),
+        columns=counts["levels"][column],
+    )
+    frame = frame.drop(columns=MISSING, errors="ignore")
+    return frame.loc[:, frame.sum() > 0]
+
+
+def crosstab(counts, year_range, countries, rows, columns):
+    """Two-way table of review counts, like ``pd.crosstab`` on the filtered rows."""
+    year_mask, country_mask = _select_cells(counts, year_range, countries)
+    if (rows, columns) in counts["pairs"]:
+        tensor = counts["pairs"][(rows, columns)]
+    else:
+        tensor = counts["pairs"][(columns, rows)].swapaxes(2, 3)
+    totals = tensor[year_mask][:, country_mask].sum(axis=(0, 1))
+    table = pd.DataFrame(
+        totals,
+        index=pd.Index(counts["levels"][rows], name=rows),
+        columns=pd.Index(counts["levels"][columns], name=columns),
+    )
+    table = table.drop(index=MISSING, columns=MISSING, errors="ignore")
+    return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+
+# ------------------------------------
+# Rating distributions
+# ------------------------------------
+# Ratings take a handful of distinct values (1-5), so a histogram per
+# (metric, Year, Country) describes the full distribution exactly and
+# box plots can be drawn without the raw rows.
+def _counts_by_cell(df, columns):
+    # Series indexed by (column, Year, Country, value)
+    parts = {
+        col: df.groupby(CELL_KEYS + [col], observed=True).size()
+        .rename_axis(CELL_KEYS + ["value"])
+        for col in columns
+        if col in df.columns
+    }
+    counts = pd.concat(parts, names=["column"])
+    counts.index = _plain_cells(counts.index)
+    return counts.sort_index()
+
+
+def _merge_counts(a, b):
+    return a.add(b, fill_value=0).astype("int64").sort_index()
+
+
+def build_rating_histogram(df, metrics):
+    """Number of reviews per (metric, Year, Country, rating value)."""
+    return _counts_by_cell(df, metrics)
+
+
+merge_rating_histograms = _merge_counts
+
+
+def _histogram_quantile(values, cum, q):
+    # Same "linear" interpolation as numpy / pandas on the expanded data
+    h = (cum[-1] - 1) * q
+    lo = values[np.searchsorted(cum, np.floor(h), side="right")]
+    hi = values[np.searchsorted(cum, np.ceil(h), side="right")]
+    return lo + (hi - lo) * (h - np.floor(h))
+
+
+def box_stats_from_histogram(histogram, year_range, countries, metric):
+    """Quartiles, 1.5 IQR whiskers and outlier values per country."""
+    selected = histogram.xs(metric, level="column")
+    selected = selected[_cell_mask(selected.index, year_range, countries)]
+    by_value = selected.groupby(level=["Country", "value"]).sum()
+
+    rows = []
+    for country, counts in by_value.groupby(level="Country"):
+        values = counts.index.get_level_values("value").to_numpy(dtype="float64")
+        cum = np.cumsum(counts.to_numpy())
+        q1, median, q3 = (_histogram_quantile(values, cum, q) for q in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        rows.append({
+            "Country": country,
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "lowerfence": inside.min(),
+            "upperfence": inside.max(),
+            "outliers": values[(values < inside.min()) | (values > inside.max())].tolist(),
+            "count": int(cum[-1]),
+        })
+    return pd.DataFrame(rows)
+
+
+def box_stats(frame, metric, by="Country", max_outliers=100, seed=0):
+    """Box-plot statistics per group computed from raw values.
+
+    Same layout as ``box_stats_from_histogram``: the browser receives one
+    row per group plus at most `max_outliers` sampled outliers each,
+    instead of every individual rating.
+    """
+    frame = frame[[by, metric]].dropna(subset=[metric])
+    grouped = frame.groupby(by, observed=True)[metric]
+
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    quartiles.columns = ["q1", "median", "q3"]
+    iqr = quartiles["q3"] - quartiles["q1"]
+    low = (quartiles["q1"] - 1.5 * iqr).reindex(frame[by]).to_numpy()
+    high = (quartiles["q3"] + 1.5 * iqr).reindex(frame[by]).to_numpy()
+
+    values = frame[metric].to_numpy()
+    inside = (values >= low) & (values <= high)
+    whiskers = frame[inside].groupby(by, observed=True)[metric].agg(["min", "max"])
+
+    outliers = frame[~inside]
+    if len(outliers):
+        outliers = (
+            outliers.sample(frac=1, random_state=seed)
+            .groupby(by, observed=True).head(max_outliers)
+            .groupby(by, observed=True)[metric].agg(list)
+        )
+    else:
+        outliers = pd.Series(dtype=object)
+
+    stats = quartiles.assign(
+        lowerfence=whiskers["min"],
+        upperfence=whiskers["max"],
+        outliers=outliers.reindex(quartiles.index),
+        count=grouped.size(),
+    )
+    stats["outliers"] = stats["outliers"].apply(lambda v: v if isinstance(v, list) else [])
+    return stats.reset_index()
+
+
+# ------------------------------------
+# Bundles
+# ------------------------------------
+def summarize(df, metrics):
+    """Every numeric / categorical aggregate of one set of reviews."""
+    summary = {
+        "metrics": list(metrics),
+        "cube": build_metric_cube(df, metrics),
+        "corr": build_corr_stats(df, metrics),
+        "ratings": build_rating_histogram(df, metrics),
+        "categories": build_category_counts(df),
+    }
+    if "Date" in df.columns:
+        summary["time"] = {
+            label: build_time_index(df, metrics, freq)
+            for label, freq in TIME_FREQS.items()
+        }
+    return summary
+
+
+def merge_summaries(a, b):
+    """Summary of the union of two disjoint sets of reviews."""
+    merged = {
+        "metrics": a["metrics"],
+        "cube": merge_metric_cubes(a["cube"], b["cube"]),
+        "corr": merge_corr_stats(a["corr"], b["corr"]),
+        "ratings": merge_rating_histograms(a["ratings"], b["ratings"]),
+        "categories": merge_category_counts(a["categories"], b["categories"]),
+    }
+    if "time" in a and "time" in b:
+        merged["time"] = {
+            label: merge_metric_cubes(a["time"][label], b["time"][label])
+            for label in a["time"]
+        }
+    return merged
@@ -1,297 +1,622 @@
 # app2.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import plotly.express as px
 
-from wordcloud import WordCloud, STOPWORDS
+import aggregates
+import cache_backend
+import charts
+import comparison
+import data_store
+import datasets
+import figure_cache
+import parallel
+import profiling
+import row_index
+import search_index
+import sentiment
+import streaming
+import text_pipeline
+import texts
+import word_index
 
 # -----------------------------------------------
 
 
 
 
+# ------------------------------------
+# Dataset: chosen with the sidebar selector, whose value is read here
+# so the page can be titled before anything else is drawn
+# ------------------------------------
+DATASETS = {
+    d["slug"]: d
+    for d in (
+        [datasets.DEFAULT_DATASET] if streaming.STREAMING_MODE
+        else datasets.list_datasets()
+    )
+}
+dataset = DATASETS.get(st.session_state.get("dataset"), next(iter(DATASETS.values())))
+
+# Filter and view widgets hold values of the dataset they were set on:
+# after a switch they start again from the new dataset's defaults
+if st.session_state.get("_shown_dataset", dataset["slug"]) != dataset["slug"]:
+    for key in [k for k in st.session_state if not k.startswith("_")]:
+        if key not in ("dataset", "view", "profile"):
+            del st.session_state[key]
+st.session_state["_shown_dataset"] = dataset["slug"]
+
+dataset_info = data_store.store_info(dataset["store"]) or {}
+# Column names only (store schema or CSV header): which views apply. No
+# freshness check here: hashing the CSV is left to the warm-up thread.
+dataset_columns = data_store.source_columns(
+    dataset["csv"], None if streaming.STREAMING_MODE else dataset["store"]
+)
+company = dataset["company"]
+period = texts.period(dataset_info)
+coverage = texts.coverage(dataset_info)
+
 # ------------------------------------
 # Page config
 # ------------------------------------
 st.set_page_config(
-    page_title="Amazon Job Reviews EDA",
+    page_title=f"{company} Job Reviews EDA",
     layout="wide"
 )
 
 
-st.title("A to Z: Analysing Amazon's Worplace Reviews")
-st.markdown("Interactive exploratory data analysis of employee reviews across countries from 2008-2020 ")
+st.title(dataset["title"])
+if dataset_info.get("first_year"):
+    st.markdown(
+        "Interactive exploratory data analysis of employee reviews across countries "
+        f"from {dataset_info['first_year']}-{dataset_info['last_year']} "
+    )
+else:
+    st.markdown("Interactive exploratory data analysis of employee reviews across countries")
+
+if len(DATASETS) > 1:
+    st.sidebar.selectbox(
+        "Dataset",
+        options=list(DATASETS),
+        format_func=lambda slug: DATASETS[slug]["company"],
+        key="dataset"
+    )
+
+
+def narrative(text):
+    # Hand-written commentary only describes the dataset it was written for
+    if dataset["narrative"]:
+        st.info(text)
+
 
 # ------------------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("amazon_job_reviews_country_year (1).csv")
-    df.columns = df.columns.str.strip()  # remove hidden spaces
-    return df
+# Columns the dashboard reads from the core column group; the rating
+# metrics are added from the stored schema.
+DASHBOARD_COLUMNS = [
+    "Year", "Date", "Country", "Position", "CEO Approval", "Recommended",
+    "Business Outlook", "Current employee", "Former employee",
+]
 
-df = load_data()
 
-# Ensure Country column exists
-if "Country" not in df.columns:
-    if "Location" in df.columns:
-        df = df.rename(columns={"Location": "Country"})
-    else:
-        st.error("Neither 'Country' nor 'Location' column found in dataset.")
-        st.stop()
+@st.cache_resource
+def get_cache_backend():
+    # Disk-backed cache shared by every Streamlit process on the host
+    return cache_backend.make_backend()
+
+
+@st.cache_resource
+def get_shared_cache(csv_path, store_dir):
+    # One scope per dataset on the shared backend
+    return cache_backend.SharedCache(get_cache_backend(), csv_path, store_dir)
+
+
+@st.cache_resource
+def get_figure_cache():
+    # Rendered PNGs shared by all sessions, LRU-evicted by total size
+    return figure_cache.FigureCache()
+
+
+shared_cache = get_shared_cache(dataset["csv"], dataset["store"])
+
+# Opt-in timing of this rerun (AMAZON_REVIEWS_PROFILE=1 or the sidebar
+# toggle, whose value is read here before the widget is drawn)
+profiler = profiling.RerunProfile(
+    enabled=st.session_state.get("profile", profiling.PROFILE_MODE),
+    counters={"shared cache": shared_cache, "figure cache": get_figure_cache()}
+)
+
+
+def current_version(csv_path, store_dir):
+    # Content hash of the CSV: part of every cache key below, so a changed
+    # file invalidates both the in-process and the shared caches. Cheap
+    # once the store is built (the hash is memoized on size and mtime).
+    # The store's aggregates are written with it, for ingest.py to extend.
+    if not streaming.STREAMING_MODE:
+        datasets.ensure_store(csv_path, store_dir, parallel.MAX_WORKERS)
+    return get_shared_cache(csv_path, store_dir).fingerprint()
+
+
+# Loaders are cached per dataset; only the most recently used
+# OPEN_DATASETS stay in memory, the rest are re-opened from their packs.
+@st.cache_resource(max_entries=datasets.OPEN_DATASETS)
+def get_loaded_core(store_dir, columns):
+    # The newest frame and row index this process has read from a store
+    return {"lock": threading.Lock(), "base": None, "parts": 0}
+
+
+def load_core(store_dir, columns):
+    """(frame, row index) of a store's current parts. After an ingest only
+    the appended parts are read and their rows merged into the index.
+    Shared and read-only; one copy per store and columns, whatever the
+    version, so older versions never hold on to frames of their own."""
+    loaded = get_loaded_core(store_dir, columns)
+    base = data_store.store_base(store_dir)
+    parts = len(data_store.part_paths(store_dir, data_store.CORE_FILE))
+    with loaded["lock"]:
+        if loaded["base"] == base and 0 < loaded["parts"] < parts:
+            df = data_store.append_frame(
+                loaded["df"], data_store.read_core(columns, store_dir, start=loaded["parts"])
+            )
+            loaded["rows"] = row_index.extend_row_index(loaded["rows"], df, len(loaded["df"]))
+            loaded["df"] = df
+        elif loaded["base"] != base or loaded["parts"] != parts:
+            loaded["df"] = data_store.read_core(columns, store_dir)
+            loaded["rows"] = row_index.build_row_index(loaded["df"])
+        loaded.update(base=base, parts=parts)
+        return loaded["df"], loaded["rows"]
+
+
+@st.cache_resource
+def load_streamed_summary(csv_path, chunk_rows, version=None):
+    # Shared, read-only aggregates folded from the CSV in one chunked pass
+    return get_shared_cache(csv_path, data_store.STORE_DIR).get_or_compute(
+        "streamed_summary", chunk_rows,
+        lambda: streaming.stream_aggregates(csv_path, chunk_rows)
+    )
+
+
+@st.cache_resource(max_entries=datasets.OPEN_DATASETS)
+def load_summary(csv_path, store_dir, columns, metrics, version=None):
+    # Prebuilt with the pack, else built once per host (in a process pool
+    # for large tables); every rerun only reduces the selected cells.
+    # Shared read-only, like the loaders below: st.cache_data would
+    # unpickle a copy of the cube and tensors on every call.
+    prebuilt = datasets.load_aggregates(store_dir)
+    if prebuilt is not None and prebuilt["metrics"] == list(metrics):
+        return prebuilt["summary"]
+    return get_shared_cache(csv_path, store_dir).get_or_compute(
+        "summary", (columns, metrics),
+        lambda: parallel.build_summary(load_core(store_dir, columns)[0], list(metrics))
+    )
+
+
+@st.cache_resource(max_entries=datasets.OPEN_DATASETS)
+def load_word_index(csv_path, store_dir, columns, version=None):
+    # Prebuilt with the pack, else summed from the persisted token
+    # matrices (one tokenization pass)
+    prebuilt = datasets.load_aggregates(store_dir)
+    if prebuilt is not None and list(columns) == list(word_index.WORDCLOUD_COLUMNS.values()):
+        return prebuilt["words"]
+    return get_shared_cache(csv_path, store_dir).get_or_compute(
+        "word_index", columns,
+        lambda: word_index.word_index_from_tokens(
+            data_store.read_core(aggregates.CELL_KEYS, store_dir),
+            {col: text_pipeline.load_or_build(col, store_dir=store_dir) for col in columns}
+        )
+    )
+
+
+@st.cache_resource(max_entries=datasets.OPEN_DATASETS)
+def load_sentiment(store_dir, metrics, version=None):
+    # Reads the scores persisted by sentiment.py; nothing is scored here
+    scores = sentiment.load_scores(store_dir)
+    if scores is None:
+        return None
+    core = data_store.read_core(
+        [data_store.ID_COL] + aggregates.CELL_KEYS + list(metrics), store_dir
+    )
+    return sentiment.summarize_sentiment(core, scores, list(metrics))
+
+
+def get_word_index(csv_path, store_dir, version):
+    if streaming.STREAMING_MODE:
+        return load_streamed_summary(csv_path, streaming.CHUNK_ROWS, version)["words"]
+    return load_word_index(
+        csv_path, store_dir, tuple(word_index.WORDCLOUD_COLUMNS.values()), version
+    )
 
 
+def load_dashboard(csv_path, store_dir, version):
+    """Everything the views read, for one version of a dataset."""
+    if streaming.STREAMING_MODE:
+        # No review rows are kept: every tab runs off the streamed aggregates
+        summary = load_streamed_summary(csv_path, streaming.CHUNK_ROWS, version)
+        return {"df": None, "numeric_cols": summary["metrics"], "summary": summary,
+                "review_rows": None}
 
-# Identify numeric metrics automatically
-numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
-numeric_cols = [c for c in numeric_cols if c not in ["Year", "ID number"]]
+    stored = data_store.core_columns(store_dir)
+    columns = tuple(
+        [c for c in DASHBOARD_COLUMNS if c in stored] + data_store.rating_columns(store_dir)
+    )
+    df, review_rows = load_core(store_dir, columns)
 
+    # Identify numeric metrics automatically
+    numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
+    numeric_cols = [c for c in numeric_cols if c not in ["Year", "ID number"]]
+
+    return {
+        "df": df,
+        "numeric_cols": numeric_cols,
+        "summary": load_summary(csv_path, store_dir, columns, tuple(numeric_cols), version),
+        "review_rows": review_rows,
+    }
 
-# Text column
-text_col = [c for c in df.columns if "review" in c.lower() or "text" in c.lower()][0]
 
 # ------------------------------------
-# Sidebar controls
+# Aggregates behind the views, cached host-wide per dataset and filter state
 # ------------------------------------
-st.sidebar.header("Controls")
+def get_yearly_means(cache, cube, year_range, countries, metrics):
+    return cache.get_or_compute(
+        "yearly_means", (tuple(year_range), tuple(countries), tuple(metrics)),
+        lambda: aggregates.yearly_means(cube, year_range, countries, metrics)
+    )
 
-year_range = st.sidebar.slider(
-    "Select Year Range",
-    int(df["Year"].min()),
-    int(df["Year"].max()),
-    (int(df["Year"].min()), int(df["Year"].max()))
-)
 
-countries = st.sidebar.multiselect(
-    "Select Countries",
-    options=df["Country"].unique(),
-    default=list(df["Country"].unique())
-)
+def get_correlation(cache, corr_stats, year_range, countries, metrics):
+    return cache.get_or_compute(
+        "correlation", (tuple(year_range), tuple(countries), tuple(metrics)),
+        lambda: aggregates.corr_from_stats(corr_stats, year_range, countries, metrics)
+    )
 
-selected_metrics = st.sidebar.multiselect(
-    "Select Rating Metrics",
-    options=numeric_cols,
-    default=numeric_cols
-)
 
-filtered_df = df[
-    (df["Year"].between(year_range[0], year_range[1])) &
-    (df["Country"].isin(countries))
-]
+def get_category_counts(cache, category_table, year_range, countries, column):
+    return cache.get_or_compute(
+        "category_counts", (tuple(year_range), tuple(countries), column),
+        lambda: aggregates.category_counts(category_table, year_range, countries, column)
+    )
 
-wordcloud_insights = {
-    ("USA", "Pros"):
-        "Positive reviews from the USA frequently emphasize pay, benefits,work environment and team. \n This shows a general appreciation of the internal work culture and the financial compensation at Amazon",
 
-    ("USA", "Cons"):
-        "Negative feedback from the USA commonly highlights words like work, rime, people and manager showing concerns about work-life balance, work intensity and management issues which can be areas of potential growth.",
+def get_mean_intervals(cache, histogram, by, year_range, countries, metrics):
+    return cache.get_or_compute(
+        "mean_intervals",
+        (tuple(by), tuple(year_range), tuple(countries), tuple(metrics), comparison.RESAMPLES),
+        lambda: comparison.mean_intervals(histogram, year_range, countries, metrics, by)
+    )
 
-    ("USA", "Advice to Management"):
-        "Advice from US employees often focuses on words like manager,time,team and management showing there exists a need for improving leadership communication and sustaining employee well-being.",
 
-    ("India", "Pros"):
-        "Indian employees frequently highlight pay,work and benefits suggesting Indian employees mostly agree with their US counterparts regarding the strongpoints of being employed at Amazon ",
+def get_country_differences(cache, histogram, year_range, countries, metrics):
+    return cache.get_or_compute(
+        "country_differences",
+        (tuple(year_range), tuple(countries), tuple(metrics), comparison.RESAMPLES),
+        lambda: comparison.country_differences(histogram, year_range, countries, metrics)
+    )
 
-    ("India", "Cons"):
-        "Concerns from Indian reviews shows words like work, time,hour break and long suggesting the cons often center around demanding work culture and long hourse.",
 
-    ("India", "Advice to Management"):
-        "Advice from Indian employees includes words like better, manager, time and management which suggests a demand for improving people management, workload distribution, and overall team support."
-}
+def get_word_frequencies(cache, words, year_range, country, column):
+    return cache.get_or_compute(
+        "word_frequencies", (tuple(year_range), country, column),
+        lambda: word_index.merged_counts(words, year_range, country, column)
+    )
+
+
+# ------------------------------------
+# Background warm-up
+# ------------------------------------
+def warm_up(pool, csv_path, store_dir):
+    """Load a dataset, then queue its default-filter aggregates in `pool`.
+
+    Returns once the data is loaded; the aggregates finish in the
+    background and land in the shared cache the views read from.
+    """
+    cache = get_shared_cache(csv_path, store_dir)
+    version = current_version(csv_path, store_dir)
+    dashboard = load_dashboard(csv_path, store_dir, version)
+    summary = dashboard["summary"]
+
+    cube = summary["cube"]
+    years = cube.index.get_level_values("Year")
+    year_range = (int(years.min()), int(years.max()))
+    countries = list(cube.index.get_level_values("Country").unique())
+    metrics = dashboard["numeric_cols"]
+
+    pool.submit(get_yearly_means, cache, cube, year_range, countries, metrics)
+    pool.submit(get_correlation, cache, summary["corr"], year_range, countries, metrics)
+    pool.submit(get_mean_intervals, cache, summary["ratings"], ["Year"], year_range, countries, metrics)
+    for col in aggregates.CATEGORY_COLS:
+        pool.submit(get_category_counts, cache, summary["categories"], year_range, countries, col)
+
+    words = get_word_index(csv_path, store_dir, version)
+    for country in countries:
+        for column in word_index.WORDCLOUD_COLUMNS.values():
+            pool.submit(get_word_frequencies, cache, words, year_range, country, column)
+    return version
+
+
+@st.cache_resource
+def get_warmup_pool():
+    return ThreadPoolExecutor(max_workers=parallel.MAX_WORKERS, thread_name_prefix="warmup")
+
+
+@st.cache_resource(max_entries=datasets.OPEN_DATASETS)
+def start_warmup(csv_path, store_dir):
+    # Runs once per dataset and process, from the first script run that
+    # selects it: the data load and default aggregates are computed while
+    # that first page is drawn.
+    pool = get_warmup_pool()
+    return pool.submit(warm_up, pool, csv_path, store_dir)
+
+
+@st.cache_resource(max_entries=datasets.OPEN_DATASETS)
+def load_inverted_index(store_dir, version=None):
+    # Persisted next to the token matrices; shared read-only by all sessions
+    return search_index.load_or_build(store_dir)
+
+
+# Above this many filtered reviews the box plot is summarized server-side
+BOX_SUMMARY_ROWS = 50_000
+BOX_MAX_OUTLIERS = 100
+
+
+def figure_key(name, *params):
+    # Scoped and versioned like the shared cache: another dataset or a
+    # changed CSV never serves old images
+    return (name, dataset["store"], data_version) + params
+
+
+def draw_heatmap(corr):
+    with profiler.stage("chart: sns.heatmap"):
+        return charts.heatmap_figure(corr)
+
+
+def draw_wordcloud(year_range, country, column):
+    with profiler.stage("aggregate: word frequencies"):
+        frequencies = get_word_frequencies(
+            shared_cache, get_word_index(dataset["csv"], dataset["store"], data_version),
+            year_range, country, column
+        )
+    with profiler.stage("chart: WordCloud.generate"):
+        return charts.wordcloud_figure(frequencies)
+
 
 # ------------------------------------
-# Tabs for navigation
+# Navigation: only the selected view runs on a rerun
+# (st.tabs would execute all nine bodies every time)
 # ------------------------------------
-tabs = st.tabs([
+VIEW_NAMES = [
     "Home",
     "Data Description",
     "Yearly Averages Table",
     "Correlation Heatmap",
     "Country-wise Trends",
     "Multivariable Trends",
+    "Monthly Trends",
     "Word Clouds",
+    "Sentiment vs Rating",
+    "Review Search",
     "Categorical Insights",
     "Overall Conclusions"
-])
-
-metric_conclusions = {
-    "Overall Rating": "Overall ratings are higher in the USA, while India shows more variability.",
-    "Work-Life Balance": "Work-life balance ratings are more tightly clustered in the USA.",
-    "Compensation & Benefits": "Compensation ratings are generally higher in the USA with fewer low outliers.",
-    "Career Opportunities": "Both countries show similar medians, but India has wider dispersion.",
-    "Culture & Values": "Cultural ratings are balanced, with fewer extreme lows in the USA.",
-    "Senior Management": "Management ratings show greater polarization in India."
-}
+]
+
+# Sub-year trends need review dates
+shown_views = [v for v in VIEW_NAMES if v != "Monthly Trends" or "Date" in dataset_columns]
+if st.session_state.get("view") not in shown_views:
+    st.session_state.pop("view", None)
+
+active_view = st.radio(
+    "View",
+    options=shown_views,
+    horizontal=True,
+    key="view",
+    label_visibility="collapsed"
+)
+
 
 # ------------------------------------
 # 0. Home Tab
 # ------------------------------------
-with tabs[0]:
-    st.subheader("Welcome to my Amazon Job Reviews EDA Dashboard!")
-    st.markdown(
-        """
-        This interactive dashboard allows you to explore employee reviews of Amazon from 2008 to 2020 across different countries.
-        
-        Our dataset includes various job satisfaction metrics such as Overall Rating, Work-Life Balance, Compensation & Benefits, Career Opportunities, Culture & Values, and Senior Management.
-
-        Use the sidebar to filter data by year range, countries, and specific rating metrics. Navigate through the tabs to view different visualizations and analyses.
-
-        The Dropdown allows you to select specific metrics you wish to visualize which will be useful for analysis across a few specific metrics 
-            """
-    )
+def show_home():
+    st.subheader(f"Welcome to my {company} Job Reviews EDA Dashboard!")
+    st.markdown(texts.home(company, period))
 # ------------------------------------
 # ------------------------------------
 # 0.5. Data Description
 # ------------------------------------
-with tabs[1]:
+def show_data_description():
     st.subheader("Dataset Overview")
-    st.markdown(
-        """
-        **Data Source:** The dataset is sourced from publicly available employee reviews gathered from Glassdoor
+    st.markdown(texts.overview(company, period))
+    st.markdown(texts.column_descriptions(company, coverage))
+
+
+# Ensure Country column exists (Location is renamed to Country by the
+# schema)
+if "Country" not in dataset_columns:
+    st.error("Neither 'Country' nor 'Location' column found in dataset.")
+    st.stop()
+
+# Home and the static part of Data Description need no data: they are
+# drawn while the warm-up runs, so first paint does not depend on the
+# size of the dataset.
+warmup = start_warmup(dataset["csv"], dataset["store"])
+
+if active_view == "Home":
+    show_home()
+elif active_view == "Data Description":
+    show_data_description()
+
+with profiler.stage("load: warm-up"):
+    with st.spinner("Loading reviews and precomputing the default views..."):
+        try:
+            warmup.result()
+        except Exception:
+            start_warmup.clear(dataset["csv"], dataset["store"])  # retry on the next rerun
+            raise
+
+with profiler.stage("load_data"):
+    data_version = current_version(dataset["csv"], dataset["store"])
+    dashboard = load_dashboard(dataset["csv"], dataset["store"], data_version)
+
+df = dashboard["df"]
+numeric_cols = dashboard["numeric_cols"]
+summary = dashboard["summary"]
+review_rows = dashboard["review_rows"]
+metric_cube = summary["cube"]
+corr_stats = summary["corr"]
+rating_histogram = summary.get("ratings")
+category_table = summary["categories"]
+time_index = summary.get("time")  # None without a Date column
+
+
+# Filter options come from the cube's (Year, Country) cells
+cube_years = metric_cube.index.get_level_values("Year")
+cube_countries = metric_cube.index.get_level_values("Country").unique()
 
-        The dataset contains employee reviews of Amazon from 2008 to 2020 across multiple countries. Each review includes various job satisfaction metrics rated on a scale, along with written feedback in the form of pros, cons, and advice to management.
-        
-        The following are the main columns/metrics in the dataset:
-        """
-    )
-    st.markdown("""
-### Column Descriptions
-
-- **ID number (Integer):** Unique identifier for each review.  
-- **Date (Character):** Date of the review (day–month–year format).  
-- **Location (Character):** Job location (city/state/country).  
-- **Position (Character):** Employee’s job title/role.  
-- **Comment for company (Character):** Overall textual comment summarizing the review.  
-- **Overall rating (Numeric):** Overall satisfaction rating (1–5).  
-- **Work/Life Balance (Numeric):** Rating for work–life balance (1–5).  
-- **Culture & Values (Numeric):** Rating for company culture and values (1–5).  
-- **Diversity & Inclusion (Numeric):** Rating for diversity and inclusion (1–5, limited data available).  
-- **Career Opportunities (Numeric):** Rating for growth and career opportunities (1–5).  
-- **Compensation and Benefits (Numeric):** Rating for pay and benefits (1–5).  
-- **Senior Management (Numeric):** Rating for management quality (1–5).  
-- **CEO Approval (Character):** Whether employees approve of the CEO (yes, no, may be).  
-- **Recommended (Character):** Whether the reviewer recommends Amazon as a workplace.  
-- **Business Outlook (Character):** Reviewer’s perception of the company’s future (positive, negative, neutral).  
-- **Current employee (Boolean):** Whether the reviewer is a current employee.  
-- **Former employee (Boolean):** Whether the reviewer is a former employee.  
-- **Timeline (Character):** Employment timeline (tenure period where available).  
-- **cons (Character):** Reported disadvantages of working at Amazon.  
-- **pros (Character):** Reported advantages of working at Amazon.  
-- **advice to Management (Character):** Suggestions for company leadership.  
-- **review_url (Character):** Link to the original Glassdoor review.
-                
-Our Data is exclusively from employees in the USA and India.
-                
-Below you can find an interactive pie chart showing the distribution of reviews by country across the entire dataset:
-""")
+# ------------------------------------
+# Sidebar controls
+# ------------------------------------
+st.sidebar.header("Controls")
 
-    st.subheader("Distribution of Reviews by Country")
+year_range = st.sidebar.slider(
+    "Select Year Range",
+    int(cube_years.min()),
+    int(cube_years.max()),
+    (int(cube_years.min()), int(cube_years.max())),
+    key="year_range"
+)
 
-    country_counts = (
-        filtered_df
-        .groupby("Country")
-        .size()
-        .reset_index(name="Number of Reviews")
-    )
+countries = st.sidebar.multiselect(
+    "Select Countries",
+    options=cube_countries,
+    default=list(cube_countries),
+    key="countries"
+)
+
+selected_metrics = st.sidebar.multiselect(
+    "Select Rating Metrics",
+    options=numeric_cols,
+    default=numeric_cols,
+    key="selected_metrics"
+)
 
-    fig = px.pie(
-        country_counts,
-        names="Country",
-        values="Number of Reviews",
-        hole=0.4,
-        title="Share of Reviews by Country"
-    )
 
-    fig.update_traces(textinfo="percent+label")
+def metrics_selected():
+    # Views drawn from a single metric (or a metric matrix) need at least one
+    if not selected_metrics:
+        st.warning("Select at least one rating metric in the sidebar.")
+    return bool(selected_metrics)
 
-    st.plotly_chart(fig, use_container_width=True)
+# ------------------------------------
+# 0.5. Data Description: review distribution
+# ------------------------------------
+def show_review_distribution():
+    st.subheader("Distribution of Reviews by Country")
+
+    with profiler.stage("aggregate: country counts"):
+        country_counts = (
+            aggregates.country_review_counts(metric_cube, year_range, countries)
+            .reset_index(name="Number of Reviews")
+        )
+
+    with profiler.stage("chart: px.pie"):
+        fig = charts.review_share_figure(country_counts)
+
+    with profiler.stage("serialize: pie"):
+        st.plotly_chart(fig, use_container_width=True)
     st.info(
         "This pie chart shows how employee reviews are distributed across countries "
         "for the selected year range and country filters."
     )
+
+    report = dataset_info if df is not None else None
+    if report:
+        st.caption(
+            f"Memory per server process: {data_store.frame_mb(df):,.1f} MB of typed, "
+            f"categorical columns (the CSV parses to {report['raw_mb']:,.1f} MB); "
+            f"the {report['text_mb_on_disk']:,.1f} MB of review text is memory-mapped "
+            "from disk and only read for the rows a view shows."
+        )
 # ------------------------------------
 
 
 # 1. Yearly averages table
 # ------------------------------------
-with tabs[2]:
+def show_yearly_averages():
     st.subheader("Year-by-Year Average Metrics")
 
+    with profiler.stage("aggregate: yearly means"):
+        table = get_yearly_means(shared_cache, metric_cube, year_range, countries, selected_metrics)
     table = (
-        filtered_df
-        .groupby("Year")[selected_metrics]
-        .mean()
+        table
         .round(2)
         .reset_index()
     )
 
-    st.dataframe(table, use_container_width=True)
+    with profiler.stage("serialize: table"):
+        st.dataframe(table, use_container_width=True)
 
     st.info("Summarizes annual trends numerically.")
-    st.info(
-        """
-        ***Key Insights:***
-
-The year-wise averages (2008–2020) reveal several important trends in Amazon employee reviews:
-
-• Overall Rating increased steadily from ~3.25 in 2008 to ~3.7 by 2020. This reflects a long-term
-improvement in employee sentiment, despite short-term dips during Amazon’s rapid expansion years.
 
-• Work–Life Balance consistently lagged behind other metrics. It declined below 3.0 between 2010–
-2015 (lowest in 2013), highlighting the intensity of Amazon’s work culture during its high-growth phase.
-Although it recovered slightly in later years, it remained the weakest dimension overall.
-
-• Career Opportunities and Compensation & Benefits showed strong upward trends, especially
-after 2012. By 2020 both exceeded 3.8, suggesting that Amazon’s rapid growth, market dominance,
-and pay improvements boosted employee perceptions of growth potential and rewards.
-
-• Senior Management dipped in the mid-2010s (2013–2015), coinciding with public criticism of Amazon’s demanding workplace culture (e.g., the 2015 New York Times article). Ratings improved afterwards, indicating gradual adaptation in leadership and communication practices.
-
-Employee sentiment at Amazon became more positive over the 12-year span. Compensation and career
-growth opportunities emerged as the strongest drivers of improvement, while work–life balance and
-management quality remained areas of concern. The data portrays Amazon as a workplace offering
-excellent financial and professional incentives, but often at the cost of personal time and wellbeing.
-We also lack any data that rates culture and values before 2012 which shows that the metric was not taken
-into consideration pre-2012 as well as lacking all data regarding"""
+    st.markdown(f"#### Yearly Means with {comparison.CONFIDENCE:.0%} Confidence Intervals")
+    with profiler.stage("aggregate: bootstrap intervals"):
+        intervals = get_mean_intervals(
+            shared_cache, rating_histogram, ["Year"], year_range, countries, selected_metrics
+        )
+    with profiler.stage("chart: bands"):
+        fig_bands = charts.band_figure(intervals.reset_index(), "Year", "metric", "Average rating")
+    with profiler.stage("serialize: bands"):
+        st.plotly_chart(fig_bands, use_container_width=True)
+    st.caption(
+        f"Shaded bands are {comparison.RESAMPLES:,}-resample bootstrap intervals of each "
+        "year's mean; years with few reviews have wide bands."
     )
+    narrative(texts.YEARLY_INSIGHTS)
 # ------------------------------------
 
 # 2. Correlation heatmap
 # ------------------------------------
-with tabs[3]:
+def show_correlation_heatmap():
     st.subheader("Correlation Between Rating Metrics")
 
-    corr = filtered_df[selected_metrics].corr()
-
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
-    st.pyplot(fig)
-
-    st.info("Highlights relationships between different job satisfaction metrics.")
-    st.info(
-    """
-    **Key Insights from the Correlation Analysis**
+    if not metrics_selected():
+        return
 
-    • Overall Rating shows strong positive relationships with all other metrics, indicating that employees’ overall satisfaction reflects multiple aspects of their work experience.
+    def correlation():
+        with profiler.stage("aggregate: correlation"):
+            return get_correlation(shared_cache, corr_stats, year_range, countries, selected_metrics)
 
-    • Senior Management and Work–Life Balance are closely linked, suggesting that effective leadership is associated with better work–life outcomes.
-
-    • Compensation & Benefits and Career Opportunities are important contributors to overall satisfaction, highlighting the role of tangible rewards and growth prospects.
+    with profiler.stage("figure: heatmap PNG"):
+        png = get_figure_cache().get_or_render(
+            figure_key("heatmap", tuple(year_range), tuple(countries), tuple(selected_metrics)),
+            lambda: draw_heatmap(correlation())
+        )
+    st.image(png, use_container_width=True)
 
-    • While most metrics move together, leadership quality and work–life balance appear especially influential in shaping employees’ broader perception of the company.
-    """
-)
+    st.info("Highlights relationships between different job satisfaction metrics.")
+    narrative(texts.CORRELATION_INSIGHTS)
 
 
 # ------------------------------------
 # ------------------------------------
 # Country-wise Trends (Boxplot + Line)
 # ------------------------------------
-with tabs[4]:
+def show_country_trends():
     st.subheader("Country-wise Rating Trends")
 
+    if not metrics_selected():
+        return
+
+    if df is not None:
+        # Resolved from the (Country, Year) offsets; columns are only
+        # copied when they are used.
+        with profiler.stage("filter: rows"):
+            filtered_df = row_index.FilteredView(
+                df, row_index.select_rows(review_rows, year_range, countries)
+            )
+
     # IMPORTANT: use a unique variable name
     selected_metric = st.selectbox(
         "Select Rating Metric",
@@ -302,17 +627,44 @@ with tabs[4]:
     # ---------- Boxplot ----------
     st.markdown("#### Distribution of Ratings by Country")
 
-    fig_box = px.box(
-        filtered_df,
-        x="Country",
-        y=selected_metric,
-        color="Country"
-    )
-
-    st.plotly_chart(fig_box, use_container_width=True)
+    if df is None:
+        # Streaming mode: boxes are drawn from the rating histograms
+        with profiler.stage("aggregate: box stats"):
+            box = aggregates.box_stats_from_histogram(
+                rating_histogram, year_range, countries, selected_metric
+            )
+        with profiler.stage("chart: box"):
+            fig_box = charts.box_figure(box, selected_metric)
+    else:
+        summarize_box = st.toggle(
+            "Summarize distributions on the server",
+            value=len(filtered_df) > BOX_SUMMARY_ROWS,
+            help="Sends quartiles, whiskers and a capped sample of outliers per "
+                 "country instead of every individual rating.",
+            key="box_summary"
+        )
+        with profiler.stage("filter: box columns"):
+            box_frame = filtered_df.frame(["Country", selected_metric])
+
+        if summarize_box:
+            with profiler.stage("aggregate: box stats"):
+                box = aggregates.box_stats(box_frame, selected_metric, max_outliers=BOX_MAX_OUTLIERS)
+            with profiler.stage("chart: box"):
+                fig_box = charts.box_figure(box, selected_metric)
+        else:
+            with profiler.stage("chart: px.box"):
+                fig_box = px.box(
+                    box_frame,
+                    x="Country",
+                    y=selected_metric,
+                    color="Country"
+                )
+
+    with profiler.stage("serialize: box"):
+        st.plotly_chart(fig_box, use_container_width=True)
 
     st.info(
-        metric_conclusions.get(
+        (texts.METRIC_CONCLUSIONS if dataset["narrative"] else {}).get(
             selected_metric,
             "Compares rating distributions across countries."
         )
@@ -323,118 +675,138 @@ with tabs[4]:
     # ---------- Line plot ----------
     st.markdown("#### Trends Over Time by Country")
 
-    yearly_country_metric = (
-        filtered_df
-        .groupby(["Year", "Country"], as_index=False)[selected_metric]
-        .mean()
-    )
+    with profiler.stage("aggregate: bootstrap intervals"):
+        yearly_country_metric = get_mean_intervals(
+            shared_cache, rating_histogram, ["Year", "Country"],
+            year_range, countries, [selected_metric]
+        )
 
-    fig_line = px.line(
-        yearly_country_metric,
-        x="Year",
-        y=selected_metric,
-        color="Country",
-        markers=True
-    )
+    with profiler.stage("chart: bands"):
+        fig_line = charts.band_figure(
+            yearly_country_metric.reset_index(), "Year", "Country", selected_metric
+        )
 
-    st.plotly_chart(fig_line, use_container_width=True)
+    with profiler.stage("serialize: line"):
+        st.plotly_chart(fig_line, use_container_width=True)
 
     st.info(
         f"Shows how **{selected_metric}** evolves over time for each country "
-        "under the current filters."
+        f"under the current filters, with {comparison.CONFIDENCE:.0%} bootstrap "
+        "confidence bands."
     )
 
+    # ---------- Country differences ----------
+    st.markdown("#### Differences Between Countries")
 
-    st.info(
+    with profiler.stage("aggregate: bootstrap differences"):
+        differences = get_country_differences(
+            shared_cache, rating_histogram, year_range, countries, selected_metrics
+        )
+    with profiler.stage("serialize: differences"):
+        st.dataframe(
+            differences.round(3),
+            hide_index=True,
+            use_container_width=True
+        )
+    st.caption(
+        "Difference in mean rating (A minus B) over the selected years. Where the "
+        "interval excludes zero, the countries differ beyond resampling noise."
+    )
 
-    """
-    **Key Takeaways**
 
-    **US reviews** appear more **stable** across metrics, while **Indian reviews** show **greater variability**.
+    narrative(texts.COUNTRY_TAKEAWAYS)
 
-    By the late 2010s, ratings across countries converge, potentially reflecting improvements in global HR practices and evolving workplace conditions.
-    
-    **More general trends in every metric on an individual basis are as follows:**
-    
-    • **Overall Satisfaction:** Ratings in both India and the USA improve steadily over time and converge by 2020, though India shows greater variability in individual experiences.
+# ------------------------------------
 
-    • **Career Opportunities:** Both countries rate career growth positively. Trends are steadier in the USA, while India exhibits more fluctuation before recovering in later years.
+# 5. Multivariable line plots
+# ------------------------------------
+def show_multivariable_trends():
+    st.subheader("Multivariable Trends Over Time")
 
-    • **Compensation & Benefits:** Ratings trend upward in both regions, with very similar central tendencies, indicating broadly comparable perceptions of compensation.
+    with profiler.stage("aggregate: yearly means"):
+        yearly_multi = get_yearly_means(shared_cache, metric_cube, year_range, countries, selected_metrics)
 
-    • **Culture & Values:** Cultural alignment is rated more favorably in the USA, with both countries showing temporary declines in the early 2010s followed by recovery.
+    with profiler.stage("chart: px.line"):
+        fig = charts.yearly_lines_figure(yearly_multi)
 
-    • **Senior Management:** Leadership is consistently among the lower-rated dimensions in both countries, though perceptions improve modestly after the mid-2010s.
+    with profiler.stage("serialize: line"):
+        st.plotly_chart(fig, use_container_width=True)
+    st.info("Allows comparison of all numeric metrics simultaneously.")
 
-    • **Work–Life Balance:** This remains the weakest-rated metric across regions, with only gradual improvement in recent years and substantial variability throughout.
-    """
-    
-)
+    narrative(texts.MULTIVARIABLE_INSIGHTS)
+    narrative(texts.COVID_INSIGHTS)
 
-# ------------------------------------
 
-# 5. Multivariable line plots
 # ------------------------------------
-with tabs[5]:
-    st.subheader("Multivariable Trends Over Time")
+# Monthly / weekly trends
+# ------------------------------------
+def show_monthly_trends():
+    st.subheader("Sub-year Trends and Calendar Heatmap")
 
-    yearly_multi = (
-        filtered_df
-        .groupby("Year")[selected_metrics]
-        .mean()
-        .reset_index()
-        .melt(id_vars="Year", var_name="Metric", value_name="Average")
+    st.markdown(
+        """
+        Review dates are parsed once when the data is loaded, and ratings are
+        pre-aggregated per calendar month and week, so these views stay
+        interactive at finer granularity than the yearly averages.
+        """
     )
 
-    fig = px.line(
-        yearly_multi,
-        x="Year",
-        y="Average",
-        color="Metric",
-        markers=True
-    )
+    if not metrics_selected():
+        return
 
-    st.plotly_chart(fig, use_container_width=True)
-    st.info("Allows comparison of all numeric metrics simultaneously.")
-
-    st.info(
-    """
-    **Year-wise Averages: Key Insights (2008–2020)**
+    granularity = st.radio(
+        "Granularity",
+        options=list(aggregates.TIME_FREQS),
+        horizontal=True,
+        key="time_granularity"
+    )
 
-    • **Overall Rating:** Shows a steady long-term increase, indicating gradual improvement in employee sentiment despite short-term fluctuations during expansion phases.
+    time_metric = st.selectbox(
+        "Select Rating Metric",
+        options=selected_metrics,
+        key="time_metric"
+    )
 
-    • **Work–Life Balance:** Declines in the early 2010s before stabilizing, suggesting sustained pressure during Amazon’s high-growth period with limited recovery.
+    # ---------- Line plot ----------
+    st.markdown(f"#### {granularity} Average by Country")
 
-    • **Career Opportunities & Compensation:** Both metrics improve markedly after 2012, reflecting stronger perceptions of growth opportunities and financial incentives.
+    with profiler.stage("aggregate: period means"):
+        period_metric = aggregates.period_means(
+            time_index[granularity], year_range, countries, time_metric
+        )
 
-    • **Senior Management:** Experiences a mid-2010s decline followed by recovery, aligning with periods of public scrutiny and subsequent organizational adjustments.
+    with profiler.stage("chart: px.line"):
+        fig_period = charts.period_figure(period_metric, time_metric)
 
-    Overall, compensation and career growth emerge as the strongest areas of improvement, while work–life balance and leadership remain persistent concerns.
-    """
-)
-    st.info(
-    """
-    **Impact of COVID-19 on Employee Sentiment (Pre- vs Post-2019)**
+    with profiler.stage("serialize: line"):
+        st.plotly_chart(fig_period, use_container_width=True)
 
-    • **Overall Rating:** Increases during the pandemic, suggesting slightly more positive overall perceptions despite challenging conditions.
+    st.divider()
 
-    • **Work–Life Balance:** Improves modestly, likely influenced by remote or hybrid work arrangements and increased flexibility.
+    # ---------- Calendar heatmap ----------
+    st.markdown("#### Calendar Heatmap (Monthly Average, Selected Countries)")
 
-    • **Career Opportunities:** Shows noticeable improvement, potentially driven by rapid expansion in logistics, cloud services, and related sectors.
+    with profiler.stage("aggregate: calendar means"):
+        calendar_grid = aggregates.calendar_means(
+            time_index["Monthly"], year_range, countries, time_metric
+        )
 
-    • **Compensation & Benefits:** Trends upward, reflecting pay raises, bonuses, and additional benefits introduced during the pandemic.
+    with profiler.stage("chart: px.imshow"):
+        fig_calendar = charts.calendar_figure(calendar_grid, time_metric)
 
-    • **Senior Management:** Improves relative to pre-pandemic years, indicating greater approval of leadership decisions during crisis management.
+    with profiler.stage("serialize: calendar"):
+        st.plotly_chart(fig_calendar, use_container_width=True)
 
-    Collectively, the COVID-19 period does not appear to negatively impact internal employee sentiment. Instead, ratings suggest a neutral to mildly positive effect on overall satisfaction.
-    """
-)
+    st.info(
+        "Each cell is the average rating of reviews written in that month. "
+        "Empty cells are months without reviews under the current filters."
+    )
 
 
 # ------------------------------------
 # 6. Word clouds
 # ------------------------------------
-with tabs[6]:
+def show_word_clouds():
     st.subheader("Word Clouds from Written Reviews")
 
     # Country selector
@@ -447,47 +819,28 @@ with tabs[6]:
     # Word cloud type selector
     wc_type = st.selectbox(
         "Select Review Type",
-        options=["Pros", "Cons", "Advice to Management"],
+        options=list(word_index.WORDCLOUD_COLUMNS),
         key="wc_type"
     )
 
     # Map dropdown label → actual column name
-    wc_column_map = {
-        "Pros": "pros",
-        "Cons": "cons",
-        "Advice to Management": "advice to Management"
-    }
-
-    text_col = wc_column_map[wc_type]
-
-    # Build text corpus
-    text = " ".join(
-        filtered_df[
-            filtered_df["Country"] == country_wc
-        ][text_col]
-        .dropna()
-        .astype(str)
-    )
+    text_col = word_index.WORDCLOUD_COLUMNS[wc_type]
 
     # Handle empty text safely
-    if text.strip() == "":
+    words = get_word_index(dataset["csv"], dataset["store"], data_version)
+    if not word_index.has_text(words, year_range, country_wc, text_col):
         st.warning("No text available for the selected filters.")
     else:
-        wc = WordCloud(
-            stopwords=STOPWORDS,
-            background_color="white",
-            width=800,
-            height=400
-        ).generate(text)
-
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.imshow(wc)
-        ax.axis("off")
-        st.pyplot(fig)
+        with profiler.stage("figure: word cloud PNG"):
+            png = get_figure_cache().get_or_render(
+                figure_key("wordcloud", tuple(year_range), country_wc, text_col),
+                lambda: draw_wordcloud(year_range, country_wc, text_col)
+            )
+        st.image(png, use_container_width=True)
 
     # Dynamic insight
     st.info(
-        wordcloud_insights.get(
+        (texts.WORDCLOUD_INSIGHTS if dataset["narrative"] else {}).get(
             (country_wc, wc_type),
             "Displays commonly used words in employee reviews for the selected filters."
         )
@@ -495,17 +848,186 @@ with tabs[6]:
 
 
 # ------------------------------------
+# Sentiment vs rating
+# ------------------------------------
+SENTIMENT_TEXTS = {
+    "All written text": "sentiment",
+    "Pros": sentiment.score_name("pros"),
+    "Cons": sentiment.score_name("cons"),
+    "Comment for company": sentiment.score_name("Comment for company"),
+}
+
+
+def show_sentiment():
+    st.subheader("Sentiment of the Written Reviews vs Ratings")
+
+    st.markdown(
+        """
+        Each review's text is scored offline with a sentiment lexicon, from -1
+        (negative) to +1 (positive). This view compares those scores with the
+        ratings the same reviewers gave, for the selected years and countries.
+        """
+    )
+
+    if streaming.STREAMING_MODE:
+        st.info("Sentiment scores are read from the column store, which the streaming mode does not build.")
+        return
+
+    if not metrics_selected():
+        return
+
+    with profiler.stage("load: sentiment"):
+        scored = load_sentiment(
+            dataset["store"], tuple(numeric_cols),
+            (data_version, sentiment.scores_version(dataset["store"]))
+        )
+    if scored is None:
+        st.info(
+            "No sentiment scores have been computed for this dataset yet. Score the "
+            f"reviews offline with `python sentiment.py {dataset['store']}`."
+        )
+        return
+
+    st.caption(
+        f"{scored['scored']:,} of {scored['reviews']:,} reviews have a score; the "
+        "rest contain no words from the lexicon or have not been scored yet."
+    )
+
+    metric_col, text_col = st.columns(2)
+    metric = metric_col.selectbox(
+        "Select Rating Metric",
+        options=selected_metrics,
+        key="sentiment_metric"
+    )
+    text_label = text_col.selectbox(
+        "Select Text",
+        options=[k for k, v in SENTIMENT_TEXTS.items() if v in scored["scores"]],
+        key="sentiment_text"
+    )
+    score = SENTIMENT_TEXTS[text_label]
+
+    # ---------- Over time ----------
+    st.markdown("#### Text Score and Rating Over Time by Country")
+
+    with profiler.stage("aggregate: yearly score and rating"):
+        trend = sentiment.yearly_score_and_rating(scored, year_range, countries, metric, score)
+    with profiler.stage("chart: score trend"):
+        fig_trend = charts.sentiment_trend_figure(trend, metric, score)
+    with profiler.stage("serialize: score trend"):
+        st.plotly_chart(fig_trend, use_container_width=True)
+
+    st.divider()
+
+    # ---------- By rating ----------
+    st.markdown(f"#### Mean Text Score by {metric}")
+
+    with profiler.stage("aggregate: score by rating"):
+        by_rating = sentiment.score_by_rating(scored, year_range, countries, metric, score)
+    with profiler.stage("chart: score by rating"):
+        fig_rating = charts.score_by_rating_figure(by_rating, metric)
+    with profiler.stage("serialize: score by rating"):
+        st.plotly_chart(fig_rating, use_container_width=True)
+
+    st.markdown("#### Correlation of Text Score and Rating")
+    with profiler.stage("aggregate: score correlation"):
+        corr = sentiment.score_rating_correlation(scored, year_range, countries, metric, score)
+    st.dataframe(corr.round(2), use_container_width=True)
+
+    st.info(
+        "Where text and ratings agree, the score rises with the rating and the "
+        "correlation is positive; a weak correlation means the written reviews "
+        "carry information the ratings do not."
+    )
+
+
+# ------------------------------------
+# Review search
+# ------------------------------------
+SEARCH_PAGE_SIZE = 20
+
+
+def show_review_search():
+    st.subheader("Search the Written Reviews")
+
+    if df is None:
+        st.info("Keyword search needs the Parquet store and is not available in streaming mode.")
+        return
+
+    query = st.text_input(
+        "Keywords",
+        value="break hours",
+        help="Searched in pros, cons and advice to management, after the same "
+             "lowercasing and stopword removal as the word clouds.",
+        key="search_query"
+    )
+    match_mode = st.radio(
+        "Match",
+        options=["Any keyword", "All keywords"],
+        horizontal=True,
+        key="search_mode"
+    )
+
+    terms = search_index.query_terms(query)
+    if not terms:
+        st.warning("Enter at least one keyword (stopwords are ignored).")
+        return
+
+    # Sorted posting lists, narrowed to the sidebar's (Country, Year) cells
+    index = load_inverted_index(dataset["store"], data_version)
+
+    def within(positions):
+        return row_index.keep_rows(review_rows, positions, year_range, countries)
+
+    with profiler.stage("aggregate: search"):
+        hits = index.search(terms, match_all=match_mode == "All keywords", keep=within)
+
+    st.markdown(f"**{len(hits):,}** matching reviews for: {', '.join(terms)}")
+
+    if len(hits):
+        pages = (len(hits) - 1) // SEARCH_PAGE_SIZE + 1
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="search_page")
+        page_rows = hits[(page - 1) * SEARCH_PAGE_SIZE:page * SEARCH_PAGE_SIZE]
+
+        # Only the rows on this page are read from the text store
+        with profiler.stage("load: result text"):
+            results = data_store.read_text_rows(
+                page_rows, [data_store.ID_COL] + search_index.SEARCH_COLUMNS, dataset["store"]
+            )
+        results.insert(1, "Year", df["Year"].to_numpy()[page_rows])
+        results.insert(2, "Country", df["Country"].to_numpy()[page_rows])
+        st.dataframe(results, use_container_width=True, hide_index=True)
+        st.caption(f"Page {page} of {pages}")
+
+    # ---------- Term counts over time ----------
+    st.markdown("#### Matching Reviews per Year")
+
+    with profiler.stage("aggregate: term counts"):
+        term_counts = search_index.term_counts_by_year(
+            index, terms, df["Year"].to_numpy(), keep=within
+        )
+    with profiler.stage("chart: px.line"):
+        fig = px.line(
+            term_counts.reset_index().melt(id_vars="Year", var_name="Keyword", value_name="Reviews"),
+            x="Year",
+            y="Reviews",
+            color="Keyword",
+            markers=True
+        )
+    with profiler.stage("serialize: line"):
+        st.plotly_chart(fig, use_container_width=True)
+
 
 # ------------------------------------
 # 7. Categorical Insights
 # ------------------------------------
-with tabs[7]:
+def show_categorical_insights():
     st.subheader("Categorical Insights: Employee Sentiment")
 
     st.markdown(
-        """
+        f"""
         This section analyzes categorical responses related to employee sentiment,
-        such as **CEO Approval** and **Recommendation of Amazon as a workplace**.
+        such as **CEO Approval**, **Recommendation of {company} as a workplace**,
+        **Business Outlook**, current vs former **Employment** and **Position**.
         All results reflect the selected year range and country filters.
         """
     )
@@ -513,40 +1035,85 @@ with tabs[7]:
     # Select categorical column
     cat_col = st.selectbox(
         "Select Categorical Variable",
-        options=["CEO Approval", "Recommended"]
+        options=list(category_table["single"]),
+        key="categorical_variable"
     )
 
     # Clean + count
-    cat_counts = (
-        filtered_df[cat_col]
-        .value_counts(dropna=True)
-        .reset_index()
-    )
-    cat_counts.columns = [cat_col, "Count"]
-
-    # Percentage calculation
-    cat_counts["Percentage"] = (
-        cat_counts["Count"] / cat_counts["Count"].sum() * 100
-    ).round(2)
+    with profiler.stage("aggregate: category counts"):
+        counts = get_category_counts(shared_cache, category_table, year_range, countries, cat_col)
+    cat_counts = charts.category_table(counts, cat_col)
 
     # Bar chart (preferred for categorical data)
-    fig = px.bar(
-        cat_counts,
-        x=cat_col,
-        y="Count",
-        text="Percentage",
-        title=f"Distribution of {cat_col}"
-    )
-
-    fig.update_traces(texttemplate="%{text}%", textposition="outside")
-    fig.update_layout(yaxis_title="Number of Reviews")
+    with profiler.stage("chart: px.bar"):
+        fig = charts.category_figure(cat_counts, cat_col)
 
-    st.plotly_chart(fig, use_container_width=True)
+    with profiler.stage("serialize: bar"):
+        st.plotly_chart(fig, use_container_width=True)
 
     # Display table
     st.markdown("#### Summary Table")
     st.dataframe(cat_counts, use_container_width=True)
 
+    st.divider()
+
+    # ---------- Over time ----------
+    st.markdown(f"#### {cat_col} Over Time")
+
+    time_mode = st.radio(
+        "Show",
+        options=["Stacked counts", "Percent of reviews"],
+        horizontal=True,
+        key="category_time_mode"
+    )
+
+    with profiler.stage("aggregate: category counts by year"):
+        by_year = charts.keep_top_levels(
+            aggregates.category_counts_by_year(category_table, year_range, countries, cat_col)
+        )
+
+    with profiler.stage("chart: px.bar"):
+        fig_time = px.bar(
+            by_year.reset_index().melt(id_vars="Year", var_name=cat_col, value_name="Reviews"),
+            x="Year",
+            y="Reviews",
+            color=cat_col
+        )
+        if time_mode == "Percent of reviews":
+            fig_time.update_layout(barnorm="percent", yaxis_title="% of Reviews")
+
+    with profiler.stage("serialize: bar"):
+        st.plotly_chart(fig_time, use_container_width=True)
+
+    # ---------- Cross-tabulation ----------
+    st.markdown("#### Cross-tabulation")
+
+    other_col = st.selectbox(
+        f"Break {cat_col} down by",
+        options=[c for c in category_table["single"] if c != cat_col],
+        key="crosstab_variable"
+    )
+
+    with profiler.stage("aggregate: crosstab"):
+        table = aggregates.crosstab(category_table, year_range, countries, other_col, cat_col)
+    table = charts.keep_top_levels(charts.keep_top_levels(table).T).T
+
+    # Row percentages: the make-up of each group
+    shares = (table.div(table.sum(axis=1), axis=0) * 100).round(1)
+
+    with profiler.stage("chart: px.imshow"):
+        fig_cross = px.imshow(
+            shares,
+            text_auto=True,
+            color_continuous_scale="Blues",
+            labels={"x": cat_col, "y": other_col, "color": "% of row"},
+            aspect="auto"
+        )
+
+    with profiler.stage("serialize: crosstab"):
+        st.plotly_chart(fig_cross, use_container_width=True)
+    st.dataframe(table, use_container_width=True)
+
     st.info(
         "These categorical distributions highlight employee sentiment without imposing "
         "numeric assumptions on qualitative responses."
@@ -555,44 +1122,84 @@ with tabs[7]:
 # ------------------------------------
 # Overall Conclusions
 # ------------------------------------
-with tabs[8]:
+def show_conclusions():
     st.subheader("Overall Conclusions & Key Takeaways")
 
-    st.markdown(
-        """
-        This section summarizes the key insights drawn from employee reviews of Amazon
-        across time periods and regions, combining quantitative ratings and qualitative feedback.
-        """
-    )
+    if not dataset["narrative"]:
+        st.info(texts.no_conclusions(company))
+        return
 
-    st.info(
-        """
-        **Key Findings**
+    st.markdown(texts.CONCLUSIONS_INTRO)
 
-        • Employee sentiment at Amazon is shaped by both **temporal changes** and **regional context**. 
-        Ratings generally improve over time, with noticeable dips during high-growth phases and recovery in later years.
+    st.info(texts.CONCLUSIONS)
 
-        • **Compensation and Career Opportunities** emerge as Amazon’s strongest aspects globally, showing consistent improvement
-        and contributing positively to overall satisfaction.
+    st.caption(texts.CONCLUSIONS_CAPTION)
 
-        • **Work–Life Balance and Senior Management** remain persistent areas of concern across regions, despite partial improvements after 2016.
 
-        • Reviews from the **USA** tend to be more stable and consistent, particularly in compensation and culture,
-        while **Indian reviews** exhibit greater variability, reflecting more diverse employee experiences.
+# ------------------------------------
+# Render the active view
+# ------------------------------------
+views = dict(zip(VIEW_NAMES, [
+    lambda: None,  # drawn above, before the data was ready
+    show_review_distribution,
+    show_yearly_averages,
+    show_correlation_heatmap,
+    show_country_trends,
+    show_multivariable_trends,
+    show_monthly_trends,
+    show_word_clouds,
+    show_sentiment,
+    show_review_search,
+    show_categorical_insights,
+    show_conclusions
+]))
+
+views[active_view]()
 
-        • Qualitative feedback reinforces these patterns, highlighting workload intensity, leadership challenges,
-        and work–life balance as recurring themes, alongside appreciation for growth opportunities and pay.
 
-        • Overall, Amazon is perceived as a **career accelerator** that offers strong professional and financial rewards,
-        but sustaining employee satisfaction over time will require continued attention to workload management
-        and leadership quality.
-        """
-    )
+# ------------------------------------
+# Profiling panel (opt-in)
+# ------------------------------------
+st.sidebar.toggle(
+    "Profile reruns",
+    value=profiling.PROFILE_MODE,
+    help="Times each stage of every rerun and appends it to the profiling log.",
+    key="profile"
+)
 
-    st.caption(
-        "These conclusions are based on aggregated trends from 2008–2020 and should be interpreted in the context "
-        "of review volume, regional differences, and evolving organizational practices."
+if profiler.enabled:
+    # Keyed widget values, to name the widget that triggered this rerun
+    widget_state = {
+        k: v for k, v in st.session_state.items()
+        if not k.startswith("_") and k != "profile"
+    }
+    trigger = profiling.changed_widgets(
+        st.session_state.get("_profile_widgets", {}), widget_state
     )
+    st.session_state["_profile_widgets"] = widget_state
+    session_id = st.session_state.setdefault("_profile_session", os.urandom(8).hex())
+
+    entry = profiler.record(active_view, trigger, session_id)
+    profiling.append_log(entry)
+
+    with st.expander("Profiling: this rerun", expanded=True):
+        st.markdown(
+            f"**{entry['total_s'] * 1000:,.1f} ms** for *{active_view}*, "
+            f"triggered by: {entry['trigger']} • "
+            f"memory {entry['rss_mb']:,.0f} MB ({entry['rss_delta_mb']:+,.1f} MB)"
+        )
+        st.dataframe(
+            pd.DataFrame({"ms": pd.Series(entry["stages"], dtype=float) * 1000})
+            .sort_values("ms", ascending=False)
+            .round(2),
+            use_container_width=True
+        )
+        st.dataframe(pd.DataFrame(entry["cache"]).T, use_container_width=True)
+        st.markdown("**Rerun latency across sessions** (from the profiling log)")
+        st.dataframe(
+            profiling.latency_summary(profiling.read_log()),
+            use_container_width=True
+        )
 
 
 # ------------------------------------
@@ -600,7 +1207,7 @@ with tabs[8]:
 # ------------------------------------
 st.markdown("---")
 
-st.markdown("Built with Streamlit •  Amazon Workplace Reviews EDA by Agnivesh Chatterjee")
+st.markdown(f"Built with Streamlit •  {company} Workplace Reviews EDA by Agnivesh Chatterjee")
 
 
 
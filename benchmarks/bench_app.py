@@ -0,0 +1,271 @@
+"""
+Headless benchmark of every dashboard tab.
+
+Drives app2.py with ``streamlit.testing.v1.AppTest`` against synthetic
+review datasets and records, per tab:
+
+    cold_start  first run with empty Streamlit caches
+    rerun       latency of each widget interaction that affects the tab
+    peak_rss_mb high-water mark of the process running that tab alone
+
+    python benchmarks/bench_app.py --rows 10000 1000000 10000000 \\
+        --output bench_results.json
+
+The store is built in one subprocess and every tab then runs in a fresh
+subprocess of its own: ``ru_maxrss`` is a process-lifetime high-water
+mark, so sharing a process would charge each tab with the peaks of the
+store build and of the tabs before it. Results are JSON records tagged
+with the git commit, so runs can be compared between commits.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+APP = os.path.join(REPO, "app2.py")
+
+TABS = [
+    "Home",
+    "Data Description",
+    "Yearly Averages Table",
+    "Correlation Heatmap",
+    "Country-wise Trends",
+    "Multivariable Trends",
+    "Monthly Trends",
+    "Word Clouds",
+    "Sentiment vs Rating",
+    "Review Search",
+    "Categorical Insights",
+    "Overall Conclusions",
+]
+
+# Sidebar filters feed every tab
+SIDEBAR_INTERACTIONS = ["year_range", "countries", "metrics"]
+
+TAB_INTERACTIONS = {
+    "Country-wise Trends": ["country_trend_metric", "box_summary"],
+    "Monthly Trends": ["time_granularity", "time_metric"],
+    "Word Clouds": ["wc_country", "wc_type"],
+    "Sentiment vs Rating": ["sentiment_metric", "sentiment_text"],
+    "Review Search": ["search_query", "search_mode"],
+    "Categorical Insights": ["categorical_variable", "category_time_mode", "crosstab_variable"],
+}
+
+
+# ------------------------------------
+# Widget interactions
+# ------------------------------------
+def _by_label(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def _widget(at, name):
+    if name == "year_range":
+        return _by_label(at.sidebar.slider, "Select Year Range")
+    if name == "countries":
+        return _by_label(at.sidebar.multiselect, "Select Countries")
+    if name == "metrics":
+        return _by_label(at.sidebar.multiselect, "Select Rating Metrics")
+    if name == "country_trend_metric":
+        return at.selectbox(key="country_trend_metric_unique")
+    if name in ("wc_country", "wc_type", "time_metric", "categorical_variable", "crosstab_variable",
+                "sentiment_metric", "sentiment_text"):
+        return at.selectbox(key=name)
+    if name in ("time_granularity", "search_mode", "category_time_mode"):
+        return at.radio(key=name)
+    if name == "search_query":
+        return at.text_input(key=name)
+    if name == "box_summary":
+        return at.toggle(key=name)
+    raise ValueError(f"Unknown interaction: {name}")
+
+
+def interact(at, name):
+    """Move one widget away from its current value; returns the old value."""
+    widget = _widget(at, name)
+    old = widget.value
+
+    if name == "year_range":
+        lo, hi = old
+        widget.set_value((lo + 1, hi) if hi > lo else (lo, hi))
+    elif name in ("countries", "metrics"):
+        widget.set_value(old[:1] if name == "countries" else old[:2])
+    elif name == "box_summary":
+        widget.set_value(not old)
+    elif name == "search_query":
+        widget.set_value(old + " pay")
+    else:
+        widget.set_value(next(o for o in widget.options if o != old))
+    return old
+
+
+def restore(at, name, value):
+    _widget(at, name).set_value(value)
+
+
+def open_tab(tab, timeout):
+    """A fresh AppTest whose navigation is set to `tab` for the first run."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.session_state["view"] = tab
+    return at
+
+
+# ------------------------------------
+# Measurement (runs inside a worker process)
+# ------------------------------------
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def bench_tab(tab, repeats, timeout):
+    import streamlit as st
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    at = open_tab(tab, timeout)
+    records = [{
+        "tab": tab,
+        "phase": "cold_start",
+        "seconds": _timed_run(at),
+        "peak_rss_mb": _peak_rss_mb(),
+    }]
+
+    for name in SIDEBAR_INTERACTIONS + TAB_INTERACTIONS.get(tab, []):
+        timings = []
+        for _ in range(repeats):
+            old = interact(at, name)
+            timings.append(_timed_run(at))
+            # Back to the default state before the next repeat
+            restore(at, name, old)
+            at.run()
+        records.append({
+            "tab": tab,
+            "phase": "rerun",
+            "interaction": name,
+            "seconds": min(timings),
+            "seconds_all": timings,
+            "peak_rss_mb": _peak_rss_mb(),
+        })
+    return records
+
+
+def run_worker(args):
+    # One tab per process; without a tab the worker builds the store
+    if args.worker_tab:
+        records = bench_tab(args.worker_tab, args.repeats, args.timeout)
+    else:
+        import data_store
+
+        start = time.perf_counter()
+        data_store.ensure_store()
+        records = [{
+            "tab": None,
+            "phase": "store_build",
+            "seconds": time.perf_counter() - start,
+            "peak_rss_mb": _peak_rss_mb(),
+        }]
+
+    with open(args.worker_output, "w") as f:
+        json.dump(records, f)
+
+
+# ------------------------------------
+# Driver
+# ------------------------------------
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_size(rows, args, workdir):
+    from synthetic import write_dataset
+
+    csv_path = os.path.join(workdir, f"reviews_{rows}.csv")
+    if not os.path.exists(csv_path):
+        write_dataset(csv_path, rows)
+
+    env = dict(
+        os.environ,
+        AMAZON_REVIEWS_CSV=csv_path,
+        AMAZON_REVIEWS_STORE=os.path.join(workdir, f"store_{rows}"),
+        # A persistent shared cache would make every "cold" start warm
+        AMAZON_REVIEWS_CACHE=os.environ.get("AMAZON_REVIEWS_CACHE", "memory"),
+        PYTHONPATH=os.pathsep.join([REPO, HERE, os.environ.get("PYTHONPATH", "")]),
+    )
+    records_path = os.path.join(workdir, f"records_{rows}.json")
+
+    records = []
+    for tab in [None] + list(args.tabs):
+        cmd = [
+            sys.executable, os.path.abspath(__file__),
+            "--worker", "--worker-output", records_path,
+            "--repeats", str(args.repeats), "--timeout", str(args.timeout),
+        ]
+        if tab:
+            cmd += ["--worker-tab", tab]
+        subprocess.run(cmd, env=env, cwd=workdir, check=True)
+        with open(records_path) as f:
+            records.extend(json.load(f))
+
+    for record in records:
+        record["rows"] = rows
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--tabs", nargs="+", default=TABS, choices=TABS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=3600)
+    parser.add_argument("--workdir", default=None,
+                        help="Where datasets and stores are kept (default: a temp dir)")
+    parser.add_argument("--output", default=None, help="JSON file (default: stdout)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-tab", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="review_bench_")
+    os.makedirs(workdir, exist_ok=True)
+
+    results = {"commit": _git_commit(), "records": []}
+    for rows in args.rows:
+        results["records"].extend(bench_size(rows, args, workdir))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
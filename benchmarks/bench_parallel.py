@@ -0,0 +1,70 @@
+"""
+Speedup of the process-pool aggregation engine versus core count.
+
+    python benchmarks/bench_parallel.py --rows 2000000 --workers 1 2 4 8
+
+Builds a synthetic review table in memory, then times
+``parallel.build_summary`` for each worker count (1 = in-process) and
+reports the speedup relative to the serial run as JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import data_store  # noqa: E402
+import parallel  # noqa: E402
+from synthetic import generate_chunk, phrase_pools  # noqa: E402
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return data_store.apply_schema(generate_chunk(rng, 0, rows, phrase_pools(rng, size=10)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count()}))
+    parser.add_argument("--by", default="Year", choices=["Year", "Country"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=None, help="JSON file (default: stdout)")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    metrics = [
+        c for c in df.select_dtypes(include="number").columns
+        if c not in data_store.NON_METRIC_NUMERIC
+    ]
+
+    records = []
+    for workers in args.workers:
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            parallel.build_summary(df, metrics, by=args.by, workers=workers, threshold=0)
+            timings.append(time.perf_counter() - start)
+        records.append({"workers": workers, "seconds": min(timings)})
+
+    serial = next((r["seconds"] for r in records if r["workers"] == 1), None)
+    for record in records:
+        record["speedup"] = serial / record["seconds"] if serial else None
+
+    results = {"rows": args.rows, "by": args.by, "cpu_count": os.cpu_count(), "records": records}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
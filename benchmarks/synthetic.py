@@ -0,0 +1,135 @@
+"""
+Synthetic review datasets that follow the documented Glassdoor schema.
+
+    python benchmarks/synthetic.py --rows 1000000 --output reviews_1m.csv
+
+Rows are written in chunks so that multi-million row files can be
+generated without holding them in memory.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+COUNTRIES = ["USA", "India"]
+LOCATIONS = {
+    "USA": ["Seattle, WA", "Austin, TX", "New York, NY", "Phoenix, AZ"],
+    "India": ["Hyderabad", "Bangalore", "Chennai", "Pune"],
+}
+POSITIONS = [
+    "Warehouse Associate", "Software Development Engineer", "Area Manager",
+    "Customer Service Associate", "Fulfillment Associate", "Program Manager",
+    "Data Analyst", "Picker/Packer", "Delivery Associate", "Operations Manager",
+]
+RATING_COLS = [
+    "Overall rating", "Work/Life Balance", "Culture & Values",
+    "Diversity & Inclusion", "Career Opportunities",
+    "Compensation and Benefits", "Senior Management",
+]
+# Share of missing values per rating column (Culture & Values is absent
+# before 2012 and Diversity & Inclusion is mostly empty in the real export)
+RATING_MISSING = {
+    "Overall rating": 0.0, "Work/Life Balance": 0.1, "Culture & Values": 0.3,
+    "Diversity & Inclusion": 0.9, "Career Opportunities": 0.1,
+    "Compensation and Benefits": 0.1, "Senior Management": 0.1,
+}
+CEO_APPROVAL = ["Approves of CEO", "Disapproves of CEO", "No opinion of CEO", None]
+RECOMMENDED = ["Recommends", "Doesn't Recommend", None]
+OUTLOOK = ["Positive Outlook", "Neutral Outlook", "Negative Outlook", None]
+TIMELINE = ["less than 1 year", "more than 1 year", "more than 3 years",
+            "more than 5 years", "more than 10 years", None]
+
+VOCABULARY = {
+    "pros": "pay benefits good great team learning growth people culture "
+            "smart fast flexible stock health insurance opportunities".split(),
+    "cons": "work time hours long break manager pressure stress shifts "
+            "management turnover metrics mandatory overtime rate".split(),
+    "advice to Management": "better manager time management listen employees "
+                            "team training communication breaks hours".split(),
+    "Comment for company": "amazon job work place great good hard fast "
+                           "paced company experience".split(),
+}
+
+FIRST_YEAR, LAST_YEAR = 2008, 2020
+
+
+def _phrase_pool(rng, words, size=2000):
+    lengths = rng.integers(3, 20, size)
+    return np.array(
+        [" ".join(rng.choice(words, n)) for n in lengths], dtype=object
+    )
+
+
+def phrase_pools(rng, size=2000):
+    """Pre-generated review texts to sample from, per text column."""
+    return {col: _phrase_pool(rng, words, size) for col, words in VOCABULARY.items()}
+
+
+def generate_chunk(rng, start_id, rows, pools):
+    country = rng.choice(COUNTRIES, rows, p=[0.7, 0.3])
+    day = pd.Timestamp(f"{FIRST_YEAR}-01-01") + pd.to_timedelta(
+        rng.integers(0, (LAST_YEAR - FIRST_YEAR + 1) * 365, rows), unit="D"
+    )
+    current = rng.random(rows) < 0.55
+
+    df = pd.DataFrame({
+        "ID number": np.arange(start_id, start_id + rows),
+        "Date": day.strftime("%d-%b-%Y"),
+        "Location": np.where(
+            country == "USA",
+            rng.choice(LOCATIONS["USA"], rows),
+            rng.choice(LOCATIONS["India"], rows),
+        ),
+        "Position": rng.choice(POSITIONS, rows),
+    })
+    df["Comment for company"] = rng.choice(pools["Comment for company"], rows)
+
+    for col in RATING_COLS:
+        values = rng.integers(1, 6, rows).astype("float64")
+        values[rng.random(rows) < RATING_MISSING[col]] = np.nan
+        df[col] = values
+
+    df["CEO Approval"] = rng.choice(np.array(CEO_APPROVAL, dtype=object), rows)
+    df["Recommended"] = rng.choice(np.array(RECOMMENDED, dtype=object), rows)
+    df["Business Outlook"] = rng.choice(np.array(OUTLOOK, dtype=object), rows)
+    df["Current employee"] = current
+    df["Former employee"] = ~current
+    df["Timeline"] = rng.choice(np.array(TIMELINE, dtype=object), rows)
+
+    for col in ["cons", "pros", "advice to Management"]:
+        text = rng.choice(pools[col], rows)
+        text[rng.random(rows) < 0.05] = None
+        df[col] = text
+
+    df["review_url"] = "https://www.glassdoor.com/Reviews/Employee-Review-Amazon-RVW" + df["ID number"].astype(str) + ".htm"
+    df["Country"] = country
+    df["Year"] = day.year
+    return df
+
+
+def write_dataset(path, rows, seed=0, chunk_rows=500_000):
+    """Write `rows` synthetic reviews to the CSV at `path`."""
+    rng = np.random.default_rng(seed)
+    pools = phrase_pools(rng)
+
+    written = 0
+    while written < rows:
+        n = min(chunk_rows, rows - written)
+        generate_chunk(rng, written, n, pools).to_csv(
+            path, mode="w" if written == 0 else "a",
+            header=written == 0, index=False,
+        )
+        written += n
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="synthetic_reviews.csv")
+    args = parser.parse_args()
+
+    write_dataset(args.output, args.rows, seed=args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
@@ -0,0 +1,155 @@
+"""
+Cross-process cache for the loaded dataset's derived aggregates.
+
+``@st.cache_data`` lives inside one Streamlit process, so every replica
+behind a load balancer used to rebuild the same aggregates. This layer
+puts a shared backend behind it:
+
+    memory                  per-process dict (previous behaviour)
+    sqlite:<path>           one SQLite file shared by all processes on a host
+
+selected with ``AMAZON_REVIEWS_CACHE`` (default: SQLite inside the
+Parquet store directory). Keys are the version of the dataset (the content
+hash of its CSV and of any batches appended to its store) plus the
+parameters, so changed data never hits stale entries. Entries are
+scoped to one dataset, and entries from older versions of a dataset's
+file are pruned as soon as a new one is seen.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import data_store
+
+CACHE_SPEC = os.environ.get(
+    "AMAZON_REVIEWS_CACHE",
+    "sqlite:" + os.path.join(data_store.STORE_DIR, "cache.sqlite"),
+)
+
+# Bump when the layout of a cached value changes, so entries written by an
+# older version of the code are never read back
+FORMAT_VERSION = "2"
+
+
+def make_key(fingerprint, name, params):
+    payload = repr((FORMAT_VERSION, fingerprint, name, params)).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+class MemoryBackend:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key, (None, None, None))[2]
+
+    def set(self, key, value, scope, source):
+        with self._lock:
+            self._entries[key] = (scope, source, value)
+
+    def prune(self, scope, source):
+        with self._lock:
+            self._entries = {
+                k: v for k, v in self._entries.items()
+                if v[0] != scope or v[1] == source
+            }
+
+
+class SqliteBackend:
+    """Pickled values in a SQLite file; safe for concurrent processes."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, scope TEXT, source TEXT, created REAL, value BLOB)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call: Streamlit sessions run in many threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commit / roll back
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key, value, scope, source):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (key, scope, source, time.time(), blob),
+            )
+
+    def prune(self, scope, source):
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM cache WHERE scope = ? AND source != ?", (scope, source)
+            )
+
+
+def make_backend(spec=CACHE_SPEC):
+    if spec == "memory":
+        return MemoryBackend()
+    if spec.startswith("sqlite:"):
+        return SqliteBackend(spec[len("sqlite:"):])
+    raise ValueError(f"Unknown AMAZON_REVIEWS_CACHE backend: {spec!r}")
+
+
+class SharedCache:
+    """Get-or-compute on top of a backend, scoped to one dataset."""
+
+    def __init__(self, backend, source_path=data_store.DATA_CSV, store_dir=data_store.STORE_DIR):
+        self.backend = backend
+        self.source_path = source_path
+        self.store_dir = store_dir
+        self.scope = os.path.abspath(store_dir)
+        self.hits = 0
+        self.misses = 0
+        self._pruned_for = None
+
+    def fingerprint(self):
+        """Version of the store built from the source CSV (the CSV's hash
+        plus any batches appended since), else the CSV's own content hash."""
+        if not self.source_path or data_store.store_is_fresh(self.source_path, self.store_dir):
+            fingerprint = data_store.store_fingerprint(self.store_dir)
+        else:
+            fingerprint = data_store.source_fingerprint(self.source_path)
+        if fingerprint != self._pruned_for:
+            # First time this version of the CSV is seen: drop older entries
+            self.backend.prune(self.scope, fingerprint)
+            self._pruned_for = fingerprint
+        return fingerprint
+
+    def get_or_compute(self, name, params, compute):
+        fingerprint = self.fingerprint()
+        key = make_key(fingerprint, name, params)
+
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute()
+        self.backend.set(key, value, self.scope, fingerprint)
+        return value
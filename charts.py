@@ -0,0 +1,205 @@
+"""
+Figure builders shared by the dashboard and the static export.
+
+Each function turns an aggregate computed in ``aggregates`` /
+``comparison`` / ``word_index`` into a Plotly or matplotlib figure; none
+of them touch Streamlit, so ``export.py`` draws exactly the figures a
+session would see.
+"""
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import seaborn as sns
+from wordcloud import WordCloud
+
+# Position has thousands of titles: charts keep the most frequent levels
+CATEGORY_TOP_LEVELS = 15
+
+
+def keep_top_levels(table, n=CATEGORY_TOP_LEVELS):
+    """The `n` largest columns of a count table; the rest summed into "Other"."""
+    if table.shape[1] <= n:
+        return table
+    order = table.sum().sort_values(ascending=False).index
+    kept = table[order[:n]].copy()
+    kept["Other"] = table[order[n:]].sum(axis=1)
+    return kept
+
+
+def review_share_figure(country_counts):
+    fig = px.pie(
+        country_counts,
+        names="Country",
+        values="Number of Reviews",
+        hole=0.4,
+        title="Share of Reviews by Country"
+    )
+    fig.update_traces(textinfo="percent+label")
+    return fig
+
+
+def band_figure(intervals, x, group, y_title):
+    """Mean line per `group` with its confidence interval shaded."""
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for i, (name, rows) in enumerate(intervals.groupby(group, sort=False)):
+        color = colors[i % len(colors)]
+        fill = "rgba({}, {}, {}, 0.2)".format(*px.colors.hex_to_rgb(color))
+        fig.add_trace(go.Scatter(
+            x=rows[x], y=rows["upper"], mode="lines", line_width=0,
+            legendgroup=name, showlegend=False, hoverinfo="skip"
+        ))
+        fig.add_trace(go.Scatter(
+            x=rows[x], y=rows["lower"], mode="lines", line_width=0,
+            fill="tonexty", fillcolor=fill,
+            legendgroup=name, showlegend=False, hoverinfo="skip"
+        ))
+        fig.add_trace(go.Scatter(
+            x=rows[x], y=rows["mean"], mode="lines+markers", name=name,
+            line_color=color, legendgroup=name,
+            customdata=rows[["lower", "upper", "n"]],
+            hovertemplate="%{y:.2f} (%{customdata[0]:.2f} to %{customdata[1]:.2f}, "
+                          "n=%{customdata[2]})"
+        ))
+    fig.update_layout(xaxis_title=x, yaxis_title=y_title, legend_title=group)
+    return fig
+
+
+def box_figure(box_stats, metric):
+    """Box plot from precomputed statistics (one trace per country)."""
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for i, row in enumerate(box_stats.itertuples()):
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Box(
+            name=row.Country,
+            x=[row.Country],
+            q1=[row.q1],
+            median=[row.median],
+            q3=[row.q3],
+            lowerfence=[row.lowerfence],
+            upperfence=[row.upperfence],
+            marker_color=color,
+            legendgroup=row.Country
+        ))
+        if row.outliers:
+            fig.add_trace(go.Scatter(
+                x=[row.Country] * len(row.outliers),
+                y=row.outliers,
+                mode="markers",
+                marker_color=color,
+                legendgroup=row.Country,
+                showlegend=False
+            ))
+    fig.update_layout(xaxis_title="Country", yaxis_title=metric)
+    return fig
+
+
+def yearly_lines_figure(yearly):
+    """All metrics' yearly means on one chart."""
+    return px.line(
+        yearly.reset_index().melt(id_vars="Year", var_name="Metric", value_name="Average"),
+        x="Year",
+        y="Average",
+        color="Metric",
+        markers=True
+    )
+
+
+def period_figure(period_metric, metric):
+    return px.line(
+        period_metric,
+        x="Period",
+        y=metric,
+        color="Country"
+    )
+
+
+def calendar_figure(calendar_grid, metric):
+    return px.imshow(
+        calendar_grid,
+        x=[pd.Timestamp(2000, m, 1).strftime("%b") for m in calendar_grid.columns],
+        y=calendar_grid.index.astype(str),
+        color_continuous_scale="RdYlGn",
+        labels={"x": "Month", "y": "Year", "color": metric},
+        aspect="auto"
+    )
+
+
+def category_table(counts, column):
+    """Counts of a categorical variable with their share, top levels only."""
+    cat_counts = keep_top_levels(counts.to_frame().T).T.reset_index()
+    cat_counts.columns = [column, "Count"]
+    cat_counts["Percentage"] = (
+        cat_counts["Count"] / cat_counts["Count"].sum() * 100
+    ).round(2)
+    return cat_counts
+
+
+def category_figure(cat_counts, column):
+    fig = px.bar(
+        cat_counts,
+        x=column,
+        y="Count",
+        text="Percentage",
+        title=f"Distribution of {column}"
+    )
+    fig.update_traces(texttemplate="%{text}%", textposition="outside")
+    fig.update_layout(yaxis_title="Number of Reviews")
+    return fig
+
+
+def sentiment_trend_figure(trend, metric, score):
+    """Mean text score (solid, left axis) and mean rating (dotted, right
+    axis) per year, one colour per country."""
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    colors = px.colors.qualitative.Plotly
+    for i, (country, rows) in enumerate(trend.groupby("Country", sort=False)):
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Scatter(
+            x=rows["Year"], y=rows[score], name=f"{country}: text score",
+            mode="lines+markers", line_color=color, legendgroup=country
+        ), secondary_y=False)
+        fig.add_trace(go.Scatter(
+            x=rows["Year"], y=rows[metric], name=f"{country}: {metric}",
+            mode="lines", line=dict(color=color, dash="dot"), legendgroup=country
+        ), secondary_y=True)
+    fig.update_xaxes(title_text="Year")
+    fig.update_yaxes(title_text="Mean text score", secondary_y=False)
+    fig.update_yaxes(title_text=f"Mean {metric}", secondary_y=True)
+    return fig
+
+
+def score_by_rating_figure(table, metric):
+    fig = px.line(
+        table,
+        x="value",
+        y="Mean score",
+        color="Country",
+        markers=True,
+        hover_data=["Reviews"]
+    )
+    fig.update_layout(xaxis_title=metric, yaxis_title="Mean text score")
+    return fig
+
+
+def heatmap_figure(corr):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
+    return fig
+
+
+def wordcloud_figure(frequencies):
+    wc = WordCloud(
+        background_color="white",
+        width=800,
+        height=400
+    ).generate_from_frequencies(frequencies)
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.imshow(wc)
+    ax.axis("off")
+    return fig
@@ -0,0 +1,127 @@
+"""
+Bootstrap confidence intervals for rating means and country differences.
+
+Ratings take a handful of distinct values, so resampling a group of n
+reviews with replacement is the same as drawing, for each rating value,
+how many of the n resampled reviews have it: one multinomial draw over
+the group's rating histogram. Every resample of every group is drawn in
+one batched call - a (resamples x groups x values) count array - so the
+cost depends on the number of groups and distinct values, not on the
+number of reviews, and no raw rows are needed (the streaming mode has
+only the histograms). Groups are split into fixed-size chunks with their
+own seeds; when there are many of them the chunks run in a process pool,
+with identical results either way.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import parallel
+
+RESAMPLES = int(os.environ.get("AMAZON_REVIEWS_RESAMPLES", "2000"))
+CONFIDENCE = 0.95
+
+# Groups per batched draw; bounds each draw's array to
+# RESAMPLES x CHUNK_GROUPS x values
+CHUNK_GROUPS = 256
+# Below this many drawn counts the process pool costs more than it saves
+PARALLEL_DRAWS = 50_000_000
+
+
+def group_histograms(histogram, year_range, countries, metrics, by):
+    """Rating counts per (metric, *by) group: one row per group, one column
+    per rating value."""
+    selected = histogram[histogram.index.get_level_values("column").isin(list(metrics))]
+    table = (
+        aggregates.select_cells(selected, year_range, countries)
+        .groupby(level=["column"] + list(by) + ["value"]).sum()
+        .unstack("value", fill_value=0)
+        .rename_axis(index={"column": "metric"})
+    )
+    table.columns = table.columns.astype("float64")
+    return table[table.sum(axis=1) > 0]
+
+
+def _bootstrap_chunk(counts, values, resamples, seed):
+    # (resamples, groups) resampled means of one chunk of groups
+    rng = np.random.default_rng(seed)
+    n = counts.sum(axis=1)
+    draws = rng.multinomial(n, counts / n[:, None], size=(resamples, len(n)))
+    return draws @ values / n
+
+
+def bootstrap_means(table, resamples=RESAMPLES, seed=0, workers=None):
+    """Resampled means of every group (row) of `table`, shape
+    (resamples, groups)."""
+    counts = table.to_numpy(dtype=np.int64)
+    values = table.columns.to_numpy(dtype="float64")
+    chunks = [counts[i:i + CHUNK_GROUPS] for i in range(0, len(counts), CHUNK_GROUPS)]
+    if not chunks:
+        return np.empty((resamples, 0))
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    workers = workers or parallel.MAX_WORKERS
+    if workers > 1 and len(chunks) > 1 and resamples * counts.size >= PARALLEL_DRAWS:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            parts = list(pool.map(
+                _bootstrap_chunk, chunks, [values] * len(chunks),
+                [resamples] * len(chunks), seeds,
+            ))
+    else:
+        parts = [_bootstrap_chunk(c, values, resamples, s) for c, s in zip(chunks, seeds)]
+    return np.concatenate(parts, axis=1)
+
+
+def _interval(estimate, boot, confidence):
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(boot, [alpha, 1 - alpha], axis=0)
+    return pd.DataFrame({"estimate": estimate, "lower": lower, "upper": upper})
+
+
+def mean_intervals(histogram, year_range, countries, metrics, by,
+                   resamples=RESAMPLES, confidence=CONFIDENCE, seed=0, workers=None):
+    """Mean of each metric per `by` group with its bootstrap interval.
+
+    Indexed by (metric, *by), with columns n, mean, lower and upper.
+    """
+    table = group_histograms(histogram, year_range, countries, metrics, by)
+    n = table.sum(axis=1)
+    mean = table.to_numpy() @ table.columns.to_numpy() / n.to_numpy()
+    boot = bootstrap_means(table, resamples, seed, workers)
+
+    intervals = _interval(mean, boot, confidence).rename(columns={"estimate": "mean"})
+    intervals.index = table.index
+    intervals.insert(0, "n", n.astype("int64"))
+    return intervals
+
+
+def country_differences(histogram, year_range, countries, metrics,
+                        resamples=RESAMPLES, confidence=CONFIDENCE, seed=0, workers=None):
+    """Difference in mean rating between every pair of countries, per metric.
+
+    The countries are resampled independently; a pair whose interval
+    excludes zero differs at the chosen confidence level.
+    """
+    table = group_histograms(histogram, year_range, countries, metrics, ["Country"])
+    n = table.sum(axis=1).to_numpy()
+    mean = table.to_numpy() @ table.columns.to_numpy() / n
+    boot = bootstrap_means(table, resamples, seed, workers)
+
+    groups = table.index.to_frame(index=False)
+    pairs = groups.reset_index().merge(
+        groups.reset_index(), on="metric", suffixes=("_a", "_b")
+    )
+    pairs = pairs[pairs["Country_a"] < pairs["Country_b"]]
+    a, b = pairs["index_a"].to_numpy(), pairs["index_b"].to_numpy()
+
+    diffs = _interval(mean[a] - mean[b], boot[:, a] - boot[:, b], confidence)
+    diffs.insert(0, "metric", pairs["metric"].to_numpy())
+    diffs.insert(1, "Country A", pairs["Country_a"].to_numpy())
+    diffs.insert(2, "Country B", pairs["Country_b"].to_numpy())
+    diffs = diffs.rename(columns={"estimate": "difference"})
+    diffs["excludes zero"] = (diffs["lower"] > 0) | (diffs["upper"] < 0)
+    return diffs.reset_index(drop=True)
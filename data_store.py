@@ -0,0 +1,476 @@
+"""
+Columnar storage for the review dataset.
+
+The raw Glassdoor export is converted once into two row-aligned files
+with an explicit, compact schema:
+
+    core.parquet  - int32 ids, dates, categorical fields and float32 ratings
+    text.arrow    - the long free-text columns (pros, cons, advice, ...) as
+                    an uncompressed Arrow IPC file that is memory-mapped
+
+The dashboard then reads only the columns it needs instead of re-parsing
+and re-inferring the whole CSV on every cold start. Text stays on disk
+(shared through the page cache by every session) until a view asks for
+specific rows or columns of it.
+
+Later batches of reviews are appended as numbered parts of both groups
+(``core.1.parquet``, ``text.1.arrow``, ...; see ``ingest.py``), which are
+read back in order after the base files.
+
+Run ``python data_store.py`` to (re)build the store ahead of deployment.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ------------------------------------
+# Locations
+# ------------------------------------
+DATA_CSV = os.environ.get(
+    "AMAZON_REVIEWS_CSV", "amazon_job_reviews_country_year (1).csv"
+)
+STORE_DIR = os.environ.get("AMAZON_REVIEWS_STORE", "review_store")
+
+CORE_FILE = "core.parquet"
+TEXT_FILE = "text.arrow"
+VERSION_FILE = "VERSION"
+SOURCE_FILE = "SOURCE"
+BASE_FILE = "BASE"
+INFO_FILE = "INFO"
+LOCK_FILE = "LOCK"
+
+# Bump when the stored schema changes so existing stores are rebuilt
+SCHEMA_VERSION = "5"
+
+# ------------------------------------
+# Schema
+# ------------------------------------
+ID_COL = "ID number"
+
+CATEGORICAL_COLS = [
+    "Country",
+    "Location",
+    "Position",
+    "CEO Approval",
+    "Recommended",
+    "Business Outlook",
+    "Timeline",
+]
+
+BOOLEAN_COLS = ["Current employee", "Former employee"]
+
+# Long free-text columns live in their own column group
+TEXT_COLS = [
+    "Comment for company",
+    "pros",
+    "cons",
+    "advice to Management",
+    "review_url",
+]
+
+# Columns that are numeric in the export but are not rating metrics
+NON_METRIC_NUMERIC = ["Year", ID_COL]
+
+
+def parse_dates(dates):
+    """Vectorized day-month-year parse into datetime64.
+
+    Reviews share few distinct dates, so each distinct string is parsed
+    once and broadcast back to the rows.
+    """
+    codes, uniques = pd.factorize(dates)
+    parsed = pd.to_datetime(
+        pd.Series(uniques, dtype=object), dayfirst=True, format="mixed", errors="coerce"
+    ).to_numpy()
+    # code -1 (missing) picks the trailing NaT
+    parsed = np.append(parsed, np.datetime64("NaT", "ns"))
+    return pd.Series(parsed[codes], index=dates.index, name=dates.name)
+
+
+def apply_schema(df):
+    df.columns = df.columns.str.strip()  # remove hidden spaces
+
+    if "Country" not in df.columns and "Location" in df.columns:
+        df = df.rename(columns={"Location": "Country"})
+
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    for col in BOOLEAN_COLS:
+        if col in df.columns and df[col].notna().all():
+            df[col] = df[col].astype(bool)
+
+    if "Year" in df.columns:
+        df["Year"] = df["Year"].astype("int16")
+
+    if ID_COL in df.columns and df[ID_COL].notna().all():
+        # At least int32, so appended batches with larger ids still fit
+        ids = pd.to_numeric(df[ID_COL], downcast="integer")
+        df[ID_COL] = ids.astype(np.promote_types(ids.dtype, np.int32))
+
+    if "Date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        df["Date"] = parse_dates(df["Date"])
+
+    rating_cols = [
+        c for c in df.select_dtypes(include=np.number).columns
+        if c not in NON_METRIC_NUMERIC
+    ]
+    df[rating_cols] = df[rating_cols].astype("float32")
+
+    for col in TEXT_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("string")
+
+    return df
+
+
+# (path, size, mtime) -> content hash, so a file is only re-hashed when
+# it changes on disk
+_fingerprints = {}
+
+
+def source_fingerprint(path=DATA_CSV):
+    """SHA-256 of a file's contents (memoized on size and mtime)."""
+    stat = os.stat(path)
+    stamp = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if stamp not in _fingerprints:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _fingerprints[stamp] = digest.hexdigest()
+    return _fingerprints[stamp]
+
+
+def _read_marker(store_dir, name):
+    try:
+        with open(os.path.join(store_dir, name)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _write_marker(store_dir, name, value):
+    def write(path):
+        with open(path, "w") as f:
+            f.write(value)
+    replace_file(os.path.join(store_dir, name), write)
+
+
+def replace_file(path, write):
+    """Call `write` with a temporary path unique to this call, next to
+    `path`, then move the result over `path` in one step. Other processes
+    reading or memory-mapping the old file keep an intact copy."""
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+@contextmanager
+def store_lock(store_dir=STORE_DIR):
+    """Exclusive lock on a store, across processes on the host; held while
+    the store is built or appended to. Blocks until it is free."""
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, LOCK_FILE), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+            yield
+            return
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:  # still held after LK_LOCK's retries
+                continue
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def store_fingerprint(store_dir=STORE_DIR):
+    """Version of the store's contents: the hash of the CSV it was built
+    from, chained with the hash of every batch appended since."""
+    return _read_marker(store_dir, SOURCE_FILE)
+
+
+def derived_is_current(path, store_dir=STORE_DIR):
+    """Whether a file derived from the store (token matrices, indexes) was
+    built from the store's current source."""
+    return _read_marker(os.path.dirname(path), os.path.basename(path) + ".source") == store_fingerprint(store_dir)
+
+
+def mark_derived(path, store_dir=STORE_DIR):
+    _write_marker(os.path.dirname(path), os.path.basename(path) + ".source", store_fingerprint(store_dir) or "")
+
+
+def store_is_fresh(csv_path=DATA_CSV, store_dir=STORE_DIR):
+    """True when the Parquet store exists and matches the CSV's contents."""
+    core = os.path.join(store_dir, CORE_FILE)
+    text = os.path.join(store_dir, TEXT_FILE)
+    if not (os.path.exists(core) and os.path.exists(text)):
+        return False
+    if _read_marker(store_dir, VERSION_FILE) != SCHEMA_VERSION:
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return _read_marker(store_dir, BASE_FILE) == source_fingerprint(csv_path)
+
+
+def frame_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def part_paths(store_dir, name):
+    """A column group's base file followed by its appended parts, in order."""
+    stem, ext = os.path.splitext(name)
+    parts = []
+    if os.path.isdir(store_dir):
+        for f in os.listdir(store_dir):
+            number = f[len(stem) + 1:-len(ext)]
+            if f.startswith(stem + ".") and f.endswith(ext) and number.isdigit():
+                parts.append((int(number), f))
+    return [os.path.join(store_dir, name)] + [
+        os.path.join(store_dir, f) for _, f in sorted(parts)
+    ]
+
+
+def _conform(df, schema):
+    # A batch as a table with exactly the base file's schema, so parts
+    # concatenate; columns the batch lacks are null
+    return pa.Table.from_arrays(
+        [
+            pa.array(df[f.name], from_pandas=True).cast(f.type)
+            if f.name in df.columns else pa.nulls(len(df), f.type)
+            for f in schema
+        ],
+        schema=schema,
+    )
+
+
+def build_store(csv_path=DATA_CSV, store_dir=STORE_DIR):
+    """Convert the review CSV into the typed, column-grouped store.
+
+    Returns the store's info: its size and coverage, and the memory report
+    (the frame as pandas infers it from the CSV versus the compacted core
+    columns a session actually holds).
+    """
+    raw = pd.read_csv(csv_path)
+    raw_mb = frame_mb(raw)
+    df = apply_schema(raw)
+
+    text_cols = [c for c in TEXT_COLS if c in df.columns]
+    core_cols = [c for c in df.columns if c not in text_cols]
+    key_cols = [ID_COL] if ID_COL in df.columns else []
+
+    os.makedirs(store_dir, exist_ok=True)
+    for path in part_paths(store_dir, CORE_FILE)[1:] + part_paths(store_dir, TEXT_FILE)[1:]:
+        os.remove(path)
+    replace_file(
+        os.path.join(store_dir, CORE_FILE),
+        lambda path: df[core_cols].to_parquet(path, index=False),
+    )
+
+    # Uncompressed IPC so the text can be memory-mapped without decoding
+    text = pa.Table.from_pandas(df[key_cols + text_cols], preserve_index=False)
+    def write_text(path):
+        with ipc.new_file(path, text.schema) as writer:
+            writer.write_table(text)
+    replace_file(os.path.join(store_dir, TEXT_FILE), write_text)
+
+    report = {
+        "rows": len(df),
+        "first_year": int(df["Year"].min()) if "Year" in df.columns else None,
+        "last_year": int(df["Year"].max()) if "Year" in df.columns else None,
+        "countries": sorted(df["Country"].dropna().astype(str).unique().tolist())
+        if "Country" in df.columns else [],
+        "raw_mb": round(raw_mb, 2),
+        "core_mb": round(frame_mb(df[core_cols]), 2),
+        "text_mb_on_disk": round(text.nbytes / 1024 ** 2, 2),
+    }
+    _write_marker(store_dir, INFO_FILE, json.dumps(report))
+    _write_marker(store_dir, BASE_FILE, source_fingerprint(csv_path))
+    _write_marker(store_dir, SOURCE_FILE, source_fingerprint(csv_path))
+    _write_marker(store_dir, VERSION_FILE, SCHEMA_VERSION)
+    return report
+
+
+def append_store(df, batch_fingerprint, store_dir=STORE_DIR):
+    """Append already-typed rows (see `apply_schema`) as a new part of
+    both column groups; returns the updated store info.
+
+    Only the batch is written. The store's version becomes the hash of
+    its previous version and `batch_fingerprint`.
+    """
+    core_paths = part_paths(store_dir, CORE_FILE)
+    core = _conform(df, pq.read_schema(core_paths[0]))
+    pq.write_table(core, os.path.join(store_dir, f"core.{len(core_paths)}.parquet"))
+
+    text_paths = part_paths(store_dir, TEXT_FILE)
+    with pa.memory_map(text_paths[0]) as source:
+        text_schema = ipc.open_file(source).schema
+    text = _conform(df, text_schema)
+    with ipc.new_file(os.path.join(store_dir, f"text.{len(text_paths)}.arrow"), text.schema) as writer:
+        writer.write_table(text)
+
+    info = store_info(store_dir) or {}
+    years = [y for y in (info.get("first_year"), info.get("last_year")) if y is not None]
+    if "Year" in df.columns:
+        years += [int(df["Year"].min()), int(df["Year"].max())]
+    info.update({
+        "rows": info.get("rows", 0) + len(df),
+        "first_year": min(years) if years else None,
+        "last_year": max(years) if years else None,
+        "countries": sorted(
+            set(info.get("countries", []))
+            | set(df["Country"].dropna().astype(str) if "Country" in df.columns else [])
+        ),
+        "text_mb_on_disk": round(info.get("text_mb_on_disk", 0) + text.nbytes / 1024 ** 2, 2),
+    })
+    _write_marker(store_dir, INFO_FILE, json.dumps(info))
+
+    version = hashlib.sha256(
+        ((store_fingerprint(store_dir) or "") + batch_fingerprint).encode()
+    ).hexdigest()
+    _write_marker(store_dir, SOURCE_FILE, version)
+    return info
+
+
+def ensure_store(csv_path=DATA_CSV, store_dir=STORE_DIR):
+    if store_is_fresh(csv_path, store_dir):
+        return
+    # Replicas starting together build the store once: the others wait for
+    # the lock and then find it fresh
+    with store_lock(store_dir):
+        if not store_is_fresh(csv_path, store_dir):
+            build_store(csv_path, store_dir)
+
+
+def store_base(store_dir=STORE_DIR):
+    """Hash of the CSV the store's base file was built from; appended parts
+    keep it, a rebuild changes it."""
+    return _read_marker(store_dir, BASE_FILE)
+
+
+def store_info(store_dir=STORE_DIR):
+    """The info written by the last `build_store`, if any."""
+    info = _read_marker(store_dir, INFO_FILE)
+    return json.loads(info) if info else None
+
+
+def core_columns(store_dir=STORE_DIR):
+    """Names of the numeric / categorical columns, from the Parquet schema."""
+    return pq.read_schema(os.path.join(store_dir, CORE_FILE)).names
+
+
+def source_columns(csv_path=DATA_CSV, store_dir=STORE_DIR):
+    """Column names of a dataset after `apply_schema` (Location becomes
+    Country): from the store's schema when it has been built, else the
+    CSV's header. Freshness is not checked, so the CSV is never hashed."""
+    paths = [os.path.join(store_dir or "", name) for name in (CORE_FILE, TEXT_FILE)]
+    if store_dir and all(os.path.exists(p) for p in paths):
+        with pa.memory_map(paths[1]) as source:
+            text = ipc.open_file(source).schema.names
+        return core_columns(store_dir) + [c for c in text if c != ID_COL]
+    return list(apply_schema(pd.read_csv(csv_path, nrows=0)).columns)
+
+
+def rating_columns(store_dir=STORE_DIR):
+    """Names of the float32 rating metrics, read from the Parquet schema only."""
+    schema = pq.read_schema(os.path.join(store_dir, CORE_FILE))
+    return [f.name for f in schema if f.type == pa.float32()]
+
+
+def read_core(columns=None, store_dir=STORE_DIR, start=0):
+    """Read (a subset of) the numeric / categorical column group, from its
+    `start`-th part on (0 is the base file)."""
+    return pa.concat_tables([
+        pq.read_table(
+            path,
+            columns=list(columns) if columns is not None else None,
+            memory_map=True,
+        )
+        for path in part_paths(store_dir, CORE_FILE)[start:]
+    ]).to_pandas()
+
+
+def append_frame(df, more):
+    """The rows of `more` after those of `df` (a new frame). Categorical
+    columns keep their dtype on the union of both categories, where a
+    plain ``pd.concat`` would fall back to object."""
+    df, more = df.copy(deep=False), more.copy(deep=False)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and col in more.columns:
+            old = df[col].cat.categories
+            categories = old.append(pd.Index(more[col].astype("category").cat.categories).difference(old))
+            dtype = pd.CategoricalDtype(categories, ordered=df[col].cat.ordered)
+            df[col] = df[col].astype(dtype)
+            more[col] = more[col].astype(dtype)
+    return pd.concat([df, more], ignore_index=True)
+
+
+# path -> ((size, mtime) of each part, memory-mapped Arrow table);
+# zero-copy, so each process maps a store's text once and pages are shared
+# through the OS cache
+_text_tables = {}
+
+
+def text_table(store_dir=STORE_DIR):
+    """The free-text column group as a memory-mapped Arrow table."""
+    paths = part_paths(os.path.abspath(store_dir), TEXT_FILE)
+    stamp = tuple((os.stat(p).st_size, os.stat(p).st_mtime_ns) for p in paths)
+    if paths[0] not in _text_tables or _text_tables[paths[0]][0] != stamp:
+        _text_tables[paths[0]] = (stamp, pa.concat_tables(
+            [ipc.open_file(pa.memory_map(p)).read_all() for p in paths]
+        ))
+    return _text_tables[paths[0]][1]
+
+
+def read_text(columns=None, store_dir=STORE_DIR):
+    """Read (a subset of) the free-text column group, row-aligned with core."""
+    table = text_table(store_dir)
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas()
+
+
+def read_text_rows(positions, columns, store_dir=STORE_DIR):
+    """Only the given rows of the text group; other pages are never touched."""
+    table = text_table(store_dir).select(list(columns))
+    return table.take(pa.array(positions, type=pa.int64())).to_pandas()
+
+
+if __name__ == "__main__":
+    report = build_store()
+    print(f"Wrote store for {DATA_CSV!r} to {STORE_DIR!r}")
+    print(
+        f"{report['rows']:,} rows: {report['raw_mb']:,.1f} MB as parsed from the CSV, "
+        f"{report['core_mb']:,.1f} MB in memory after compaction "
+        f"(+{report['text_mb_on_disk']:,.1f} MB of memory-mapped text)"
+    )
@@ -0,0 +1,224 @@
+"""
+Registry of the review datasets the dashboard can serve.
+
+Each employer's export is ingested once into a *pack*: a directory with
+the typed column store (``core.parquet`` plus the memory-mapped
+``text.arrow``), the token matrices and keyword index, the precomputed
+aggregates, the sentiment scores and a ``pack.json`` describing the dataset:
+
+    python datasets.py add reviews_acme.csv --company "Acme"
+    python datasets.py list
+
+Packs live under ``AMAZON_REVIEWS_PACKS`` (default ``packs/``). The
+original single-CSV setup (``AMAZON_REVIEWS_CSV`` / ``AMAZON_REVIEWS_STORE``)
+stays available as the ``default`` dataset. Nothing is read until a
+dataset is selected, and a selected pack is opened from its files
+instead of re-parsing a CSV.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import re
+
+import pandas as pd
+
+import aggregates
+import data_store
+import parallel
+import search_index
+import sentiment
+import text_pipeline
+import word_index
+
+PACKS_DIR = os.environ.get("AMAZON_REVIEWS_PACKS", "packs")
+PACK_FILE = "pack.json"
+# Datasets a worker keeps loaded at once; others are re-opened on demand
+OPEN_DATASETS = int(os.environ.get("AMAZON_REVIEWS_OPEN_DATASETS", "4"))
+AGGREGATES_FILE = "aggregates.pkl"
+# Every view filters on Year and Country; scores and search results are
+# keyed by the review id. Date is optional (it only feeds Monthly Trends).
+REQUIRED_COLUMNS = [data_store.ID_COL, "Year", "Country"]
+
+# The dataset the dashboard was written for; its hand-written commentary
+# ("narrative") only describes this export.
+DEFAULT_DATASET = {
+    "slug": "default",
+    "company": "Amazon",
+    "title": "A to Z: Analysing Amazon's Worplace Reviews",
+    "csv": data_store.DATA_CSV,
+    "store": data_store.STORE_DIR,
+    "narrative": True,
+}
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "dataset"
+
+
+def _read_pack(pack_dir):
+    with open(os.path.join(pack_dir, PACK_FILE)) as f:
+        dataset = json.load(f)
+    dataset["store"] = pack_dir
+    return dataset
+
+
+def list_datasets(packs_dir=PACKS_DIR):
+    """The default dataset (when present) followed by every pack, by slug."""
+    datasets = []
+    if os.path.exists(DEFAULT_DATASET["csv"]) or os.path.exists(
+        os.path.join(DEFAULT_DATASET["store"], data_store.CORE_FILE)
+    ):
+        datasets.append(dict(DEFAULT_DATASET))
+
+    if os.path.isdir(packs_dir):
+        for name in sorted(os.listdir(packs_dir)):
+            if os.path.exists(os.path.join(packs_dir, name, PACK_FILE)):
+                datasets.append(_read_pack(os.path.join(packs_dir, name)))
+
+    return datasets or [dict(DEFAULT_DATASET)]
+
+
+# ------------------------------------
+# Precomputed aggregates
+# ------------------------------------
+def build_aggregates(store_dir, workers=1):
+    """Dashboard summary and word index of a store, as the views read them."""
+    core = data_store.read_core(store_dir=store_dir)
+    metrics = data_store.rating_columns(store_dir)
+    return {
+        "metrics": metrics,
+        "summary": parallel.build_summary(core, metrics, workers=workers),
+        "words": word_index.word_index_from_tokens(
+            core[aggregates.CELL_KEYS],
+            {
+                col: text_pipeline.load_or_build(col, store_dir=store_dir, workers=workers)
+                for col in word_index.WORDCLOUD_COLUMNS.values()
+            },
+        ),
+    }
+
+
+def write_aggregates(store_dir, aggregated):
+    path = os.path.join(store_dir, AGGREGATES_FILE)
+
+    # Replaced in one step: running sessions may be reading the old file
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            pickle.dump(aggregated, f, protocol=pickle.HIGHEST_PROTOCOL)
+    data_store.replace_file(path, write)
+    data_store.mark_derived(path, store_dir)
+
+
+def save_aggregates(store_dir, workers=1):
+    write_aggregates(store_dir, build_aggregates(store_dir, workers))
+
+
+def aggregates_are_current(store_dir):
+    path = os.path.join(store_dir, AGGREGATES_FILE)
+    return os.path.exists(path) and data_store.derived_is_current(path, store_dir)
+
+
+def ensure_store(csv_path, store_dir, workers=1):
+    """Build a dataset's store from its CSV when missing or stale, together
+    with its aggregates: ingest.py merges new batches into those instead
+    of recomputing them from every review."""
+    def is_current():
+        return data_store.store_is_fresh(csv_path, store_dir) and aggregates_are_current(store_dir)
+
+    if is_current():
+        return
+    # Under the store's lock, which ingest.py holds while it appends: a
+    # session arriving mid-ingest waits for it rather than rebuilding
+    with data_store.store_lock(store_dir):
+        if not data_store.store_is_fresh(csv_path, store_dir):
+            data_store.build_store(csv_path, store_dir)
+        if not aggregates_are_current(store_dir):
+            save_aggregates(store_dir, workers)
+
+
+def load_aggregates(store_dir):
+    """The pack's precomputed aggregates, or None if missing or stale."""
+    if not aggregates_are_current(store_dir):
+        return None
+    with open(os.path.join(store_dir, AGGREGATES_FILE), "rb") as f:
+        return pickle.load(f)
+
+
+# ------------------------------------
+# Ingestion
+# ------------------------------------
+def check_export(csv_path, sample_rows=1000):
+    """Raise ValueError unless the export has the columns the dashboard needs."""
+    sample = data_store.apply_schema(pd.read_csv(csv_path, nrows=sample_rows))
+    missing = [c for c in REQUIRED_COLUMNS if c not in sample.columns]
+    if missing:
+        raise ValueError(
+            f"{csv_path!r} has no {', '.join(map(repr, missing))} column"
+            + (" (a 'Location' column is used as 'Country')" if "Country" in missing else "")
+        )
+    if not any(sample[c].dtype == "float32" for c in sample.columns):
+        raise ValueError(f"{csv_path!r} has no numeric rating columns")
+
+
+def build_pack(csv_path, company, slug=None, title=None, packs_dir=PACKS_DIR,
+               workers=parallel.MAX_WORKERS):
+    """Ingest one export into a pack and register it."""
+    slug = slug or slugify(company)
+    pack_dir = os.path.join(packs_dir, slug)
+
+    check_export(csv_path)
+    info = data_store.build_store(csv_path, pack_dir)
+    for column in text_pipeline.TEXT_COLUMNS:
+        text_pipeline.load_or_build(column, store_dir=pack_dir, workers=workers)
+    search_index.load_or_build(pack_dir)
+    sentiment.load_or_score(pack_dir, workers)
+    save_aggregates(pack_dir, workers)
+
+    dataset = {
+        "slug": slug,
+        "company": company,
+        "title": title or f"Analysing {company}'s Workplace Reviews",
+        "csv": os.path.abspath(csv_path),
+        "narrative": False,
+    }
+    with open(os.path.join(pack_dir, PACK_FILE), "w") as f:
+        json.dump(dataset, f, indent=2)
+
+    dataset["store"] = pack_dir
+    dataset["info"] = info
+    return dataset
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="ingest a review export into a pack")
+    add.add_argument("csv")
+    add.add_argument("--company", required=True)
+    add.add_argument("--slug")
+    add.add_argument("--title")
+    commands.add_parser("list", help="list the registered datasets")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        try:
+            dataset = build_pack(args.csv, args.company, args.slug, args.title)
+        except ValueError as e:
+            parser.error(str(e))
+        info = dataset["info"]
+        print(
+            f"Built pack {dataset['slug']!r} in {dataset['store']!r}: "
+            f"{info['rows']:,} reviews, {info['first_year']}-{info['last_year']}"
+        )
+        if "Date" not in data_store.core_columns(dataset["store"]):
+            print("No 'Date' column: the Monthly Trends view is hidden for this dataset")
+    else:
+        for dataset in list_datasets():
+            info = data_store.store_info(dataset["store"]) or {}
+            print(
+                f"{dataset['slug']:<20} {dataset['company']:<20} "
+                f"{info.get('rows', 0):>10,} reviews  {dataset['store']}"
+            )
@@ -0,0 +1,507 @@
+"""
+Static export of the dashboard for readers who do not need a live server.
+
+Every view that depends only on the sidebar filters is pre-rendered for a
+grid of filter states into a bundle of plain files, together with the
+written text of the dashboard (Home, the column glossary, the commentary
+and the conclusions):
+
+    python export.py bundle/                        # full range; all + each country
+    python export.py bundle/ --dataset acme --years 2008-2020 --years 2016-2020 \\
+        --countries all --countries USA,India
+
+    bundle/index.html                 states of every exported dataset
+    bundle/plotly.min.js              shared by every chart page
+    bundle/<dataset>/<state>/         one filter state: index.html, Plotly
+                                      charts (.html), heatmap and word clouds
+                                      (.png), tables (.parquet and .csv),
+                                      text (.md)
+
+Views are computed with the same aggregates and chart builders as
+app2.py. States are rendered in a process pool and each state directory
+carries a manifest of the data version it was rendered from, so a re-run
+only renders states that are new or whose data changed. What stays
+live-only, and why, is listed in ``LIVE_ONLY`` and on the bundle's index
+page.
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.offline
+
+import aggregates
+import cache_backend
+import charts
+import comparison
+import data_store
+import datasets
+import figure_cache
+import parallel
+import sentiment
+import texts
+import word_index
+
+# Bump when the bundle layout changes so existing states are re-rendered
+EXPORT_VERSION = "2"
+MANIFEST_FILE = "manifest.json"
+PLOTLY_JS = "plotly.min.js"
+
+# Parts of the dashboard that cannot be pre-rendered for a filter state
+LIVE_ONLY = [
+    "Review Search: results depend on free-text queries.",
+    "Categorical Insights over time and cross-tabulated: one chart per pair "
+    "of variables and display mode; the distribution of each variable is exported.",
+    "Sentiment vs Rating per text column: the combined score of all written "
+    "text is exported for every metric.",
+    "Monthly Trends at weekly granularity: the monthly lines and calendar "
+    "heatmap are exported.",
+    "Country-wise box plots of individual ratings: the exported boxes are "
+    "drawn from the rating histograms.",
+    "The short captions explaining each widget, and the profiling panel.",
+]
+
+
+# ------------------------------------
+# Data and filter grid
+# ------------------------------------
+def load_dataset(dataset, workers=parallel.MAX_WORKERS):
+    """Aggregates of one dataset, written with its store."""
+    datasets.ensure_store(dataset["csv"], dataset["store"], workers)
+    cache = cache_backend.SharedCache(
+        cache_backend.make_backend(), dataset["csv"], dataset["store"]
+    )
+    aggregated = datasets.load_aggregates(dataset["store"])
+
+    # Scored offline by sentiment.py; the view is left out until they exist
+    scores = sentiment.load_scores(dataset["store"])
+    scored = None if scores is None else sentiment.summarize_sentiment(
+        data_store.read_core(
+            [data_store.ID_COL] + aggregates.CELL_KEYS + aggregated["metrics"], dataset["store"]
+        ),
+        scores, aggregated["metrics"],
+    )
+    return dict(
+        aggregated,
+        dataset=dataset,
+        info=data_store.store_info(dataset["store"]) or {},
+        sentiment=scored,
+        version=f"{cache.fingerprint()}:{sentiment.scores_version(dataset['store'])}",
+    )
+
+
+def filter_grid(cube, year_ranges=None, country_sets=None):
+    """(year_range, countries) states; "all" and "each" expand to every
+    country together and to each country on its own."""
+    years = cube.index.get_level_values("Year")
+    all_countries = sorted(cube.index.get_level_values("Country").unique())
+    year_ranges = year_ranges or [(int(years.min()), int(years.max()))]
+
+    sets = []
+    for spec in country_sets or ["all", "each"]:
+        if spec == "all":
+            sets.append(all_countries)
+        elif spec == "each":
+            sets.extend([c] for c in all_countries)
+        else:
+            sets.append(sorted(c.strip() for c in spec.split(",")))
+    sets = list(dict.fromkeys(tuple(s) for s in sets))
+    return [(tuple(yr), countries) for yr in year_ranges for countries in sets]
+
+
+def state_name(year_range, countries, all_countries):
+    label = "all" if list(countries) == list(all_countries) else "+".join(
+        datasets.slugify(c) for c in countries
+    )
+    return f"{year_range[0]}-{year_range[1]}_{label}"
+
+
+# ------------------------------------
+# Rendering one filter state
+# ------------------------------------
+class StateWriter:
+    """Writes a state's files and lists them, in order, for its index page."""
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+        self.sections = []
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _add(self, tab, title, kind, name):
+        self.sections.append({"tab": tab, "title": title, "kind": kind, "file": name})
+
+    def plotly(self, tab, title, name, fig):
+        # Two levels below the bundle root, next to the other states
+        fig.write_html(
+            os.path.join(self.state_dir, name + ".html"),
+            include_plotlyjs=f"../../{PLOTLY_JS}",
+        )
+        self._add(tab, title, "plotly", name + ".html")
+
+    def png(self, tab, title, name, fig):
+        with open(os.path.join(self.state_dir, name + ".png"), "wb") as f:
+            f.write(figure_cache.figure_to_png(fig))
+        self._add(tab, title, "png", name + ".png")
+
+    def table(self, tab, title, name, frame):
+        frame.to_parquet(os.path.join(self.state_dir, name + ".parquet"))
+        frame.to_csv(os.path.join(self.state_dir, name + ".csv"))
+        self._add(tab, title, "table", name)
+
+    def text(self, tab, title, name, markdown):
+        with open(os.path.join(self.state_dir, name + ".md"), "w") as f:
+            f.write(markdown)
+        self._add(tab, title, "text", name + ".md")
+
+
+def render_state(data, year_range, countries, state_dir):
+    """Every filter-only view of `data` for one state, with the dashboard's
+    text; returns its sections."""
+    summary, metrics = data["summary"], data["metrics"]
+    cube, histogram = summary["cube"], summary["ratings"]
+    company, narrative = data["dataset"]["company"], data["dataset"]["narrative"]
+    period = texts.period(data["info"])
+    out = StateWriter(state_dir)
+
+    out.text("Home", f"Welcome to my {company} Job Reviews EDA Dashboard!", "home",
+             texts.home(company, period))
+
+    country_counts = (
+        aggregates.country_review_counts(cube, year_range, countries)
+        .reset_index(name="Number of Reviews")
+    )
+    if not country_counts["Number of Reviews"].sum():
+        return out.sections
+
+    tab = "Data Description"
+    out.text(tab, "Dataset Overview", "overview", texts.overview(company, period))
+    out.text(tab, "", "column_descriptions",
+             texts.column_descriptions(company, texts.coverage(data["info"])))
+    out.plotly(tab, "Share of Reviews by Country", "review_share",
+               charts.review_share_figure(country_counts))
+
+    tab = "Yearly Averages Table"
+    yearly = aggregates.yearly_means(cube, year_range, countries, metrics)
+    out.table(tab, "Year-by-Year Average Metrics", "yearly_means", yearly)
+    intervals = comparison.mean_intervals(
+        histogram, year_range, countries, metrics, ["Year"], workers=1
+    )
+    out.table(tab, "Yearly Means with Confidence Intervals", "yearly_intervals", intervals)
+    out.plotly(tab, "Yearly Means with Confidence Intervals", "yearly_bands",
+               charts.band_figure(intervals.reset_index(), "Year", "metric", "Average rating"))
+    if narrative:
+        out.text(tab, "", "yearly_insights", texts.YEARLY_INSIGHTS)
+
+    tab = "Correlation Heatmap"
+    corr = aggregates.corr_from_stats(summary["corr"], year_range, countries, metrics)
+    out.png(tab, "Correlation Between Rating Metrics", "correlation", charts.heatmap_figure(corr))
+    out.table(tab, "Correlation Between Rating Metrics", "correlation", corr)
+    if narrative:
+        out.text(tab, "", "correlation_insights", texts.CORRELATION_INSIGHTS)
+
+    tab = "Country-wise Trends"
+    by_country = comparison.mean_intervals(
+        histogram, year_range, countries, metrics, ["Year", "Country"], workers=1
+    )
+    for metric in metrics:
+        name = datasets.slugify(metric)
+        box = aggregates.box_stats_from_histogram(histogram, year_range, countries, metric)
+        out.plotly(tab, f"Distribution of {metric} by Country", f"country_box_{name}",
+                   charts.box_figure(box, metric))
+        if narrative and metric in texts.METRIC_CONCLUSIONS:
+            out.text(tab, "", f"country_box_{name}", texts.METRIC_CONCLUSIONS[metric])
+        if metric in by_country.index.get_level_values("metric"):
+            out.plotly(tab, f"{metric} Over Time by Country", f"country_trend_{name}",
+                       charts.band_figure(by_country.loc[metric].reset_index(),
+                                          "Year", "Country", metric))
+    out.table(tab, "Differences Between Countries", "country_differences",
+              comparison.country_differences(histogram, year_range, countries, metrics, workers=1))
+    if narrative:
+        out.text(tab, "", "country_takeaways", texts.COUNTRY_TAKEAWAYS)
+
+    tab = "Multivariable Trends"
+    out.plotly(tab, "Multivariable Trends Over Time", "multivariable",
+               charts.yearly_lines_figure(yearly))
+    if narrative:
+        out.text(tab, "", "multivariable_insights", texts.MULTIVARIABLE_INSIGHTS)
+        out.text(tab, "", "covid_insights", texts.COVID_INSIGHTS)
+
+    if "time" in summary:
+        tab = "Monthly Trends"
+        for metric in metrics:
+            name = datasets.slugify(metric)
+            out.plotly(tab, f"Monthly Average of {metric} by Country", f"monthly_{name}",
+                       charts.period_figure(aggregates.period_means(
+                           summary["time"]["Monthly"], year_range, countries, metric
+                       ), metric))
+            out.plotly(tab, f"Calendar Heatmap of {metric}", f"calendar_{name}",
+                       charts.calendar_figure(aggregates.calendar_means(
+                           summary["time"]["Monthly"], year_range, countries, metric
+                       ), metric))
+
+    tab = "Word Clouds"
+    for country in countries:
+        for label, column in word_index.WORDCLOUD_COLUMNS.items():
+            if word_index.has_text(data["words"], year_range, country, column):
+                frequencies = word_index.merged_counts(data["words"], year_range, country, column)
+                name = f"wordcloud_{datasets.slugify(country)}_{datasets.slugify(label)}"
+                out.png(tab, f"{label}: {country}", name, charts.wordcloud_figure(frequencies))
+                if narrative and (country, label) in texts.WORDCLOUD_INSIGHTS:
+                    out.text(tab, "", name, texts.WORDCLOUD_INSIGHTS[(country, label)])
+
+    if data["sentiment"] is not None:
+        # The combined score of all written text, as the view opens
+        tab, scored, score = "Sentiment vs Rating", data["sentiment"], "sentiment"
+        for metric in metrics:
+            name = datasets.slugify(metric)
+            trend = sentiment.yearly_score_and_rating(scored, year_range, countries, metric, score)
+            out.plotly(tab, f"Text Score and {metric} Over Time by Country",
+                       f"sentiment_trend_{name}", charts.sentiment_trend_figure(trend, metric, score))
+            by_rating = sentiment.score_by_rating(scored, year_range, countries, metric, score)
+            out.plotly(tab, f"Mean Text Score by {metric}", f"sentiment_by_rating_{name}",
+                       charts.score_by_rating_figure(by_rating, metric))
+            out.table(tab, f"Correlation of Text Score and {metric}", f"sentiment_corr_{name}",
+                      sentiment.score_rating_correlation(scored, year_range, countries, metric, score))
+
+    tab = "Categorical Insights"
+    for column in summary["categories"]["single"]:
+        counts = aggregates.category_counts(summary["categories"], year_range, countries, column)
+        cat_counts = charts.category_table(counts, column)
+        name = datasets.slugify(column)
+        out.plotly(tab, f"Distribution of {column}", f"category_{name}",
+                   charts.category_figure(cat_counts, column))
+        out.table(tab, f"Distribution of {column}", f"category_{name}", cat_counts)
+
+    tab = "Overall Conclusions"
+    if narrative:
+        out.text(tab, "", "conclusions_intro", texts.CONCLUSIONS_INTRO)
+        out.text(tab, "", "conclusions", texts.CONCLUSIONS)
+        out.text(tab, "", "conclusions_caption", texts.CONCLUSIONS_CAPTION)
+    else:
+        out.text(tab, "", "conclusions", texts.no_conclusions(company))
+
+    return out.sections
+
+
+def write_state_index(state_dir, title, sections):
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    tab = None
+    for section in sections:
+        if section["tab"] != tab:
+            tab = section["tab"]
+            parts.append(f"<h2>{html.escape(tab)}</h2>")
+        if section["title"]:
+            parts.append(f"<h3>{html.escape(section['title'])}</h3>")
+        src = html.escape(section["file"])
+        if section["kind"] == "text":
+            with open(os.path.join(state_dir, section["file"])) as f:
+                parts.append(_markdown_html(f.read()))
+        elif section["kind"] == "plotly":
+            parts.append(f'<iframe src="{src}" width="100%" height="520" frameborder="0"></iframe>')
+        elif section["kind"] == "png":
+            parts.append(f'<img src="{src}" style="max-width:100%">')
+        else:
+            parts.append(f'<p><a href="{src}.csv">CSV</a> · <a href="{src}.parquet">Parquet</a></p>')
+    if not sections:
+        parts.append("<p>No reviews match this filter state.</p>")
+    _write_page(os.path.join(state_dir, "index.html"), title, parts)
+
+
+def _inline_html(text):
+    text = html.escape(text, quote=False)
+    text = re.sub(r"\*\*\*(.+?)\*\*\*", r"<strong><em>\1</em></strong>", text)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    return re.sub(r"\*(.+?)\*", r"<em>\1</em>", text)
+
+
+def _markdown_html(text):
+    """HTML for the Markdown the dashboard's text uses: headings, "- "
+    lists, bold and italics; other lines are joined into paragraphs."""
+    parts, paragraph, items = [], [], []
+
+    def flush():
+        if paragraph:
+            parts.append(f"<p>{_inline_html(' '.join(paragraph))}</p>")
+            paragraph.clear()
+        if items:
+            parts.append("<ul>" + "".join(f"<li>{_inline_html(i)}</li>" for i in items) + "</ul>")
+            items.clear()
+
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#"):
+            flush()
+            level = min(len(line) - len(line.lstrip("#")) + 1, 6)
+            parts.append(f"<h{level}>{_inline_html(line.lstrip('#').strip())}</h{level}>")
+        elif line.startswith("- "):
+            if paragraph:
+                flush()
+            items.append(line[2:])
+        elif line:
+            if items:
+                flush()
+            paragraph.append(line)
+        else:
+            flush()
+    flush()
+    return "\n".join(parts)
+
+
+def _write_page(path, title, parts):
+    with open(path, "w") as f:
+        f.write(
+            f"<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<title>{html.escape(title)}</title></head><body>"
+            + "\n".join(parts) + "</body></html>"
+        )
+
+
+# ------------------------------------
+# Bundle
+# ------------------------------------
+def _read_manifest(state_dir):
+    try:
+        with open(os.path.join(state_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current(state_dir, version):
+    manifest = _read_manifest(state_dir)
+    return (
+        manifest is not None
+        and manifest["export_version"] == EXPORT_VERSION
+        and manifest["source"] == version
+    )
+
+
+# Aggregates shared with each worker once, at start-up; tasks only carry
+# the filter state.
+_data = None
+
+
+def _init_worker(data):
+    global _data
+    _data = data
+
+
+def _export_state(year_range, countries, state_dir, title):
+    sections = render_state(_data, year_range, countries, state_dir)
+    write_state_index(state_dir, title, sections)
+    # Written last: a state interrupted mid-render is redone next time
+    with open(os.path.join(state_dir, MANIFEST_FILE), "w") as f:
+        json.dump({
+            "export_version": EXPORT_VERSION,
+            "source": _data["version"],
+            "year_range": list(year_range),
+            "countries": list(countries),
+            "sections": sections,
+        }, f, indent=2)
+    return state_dir
+
+
+def export_dataset(dataset, out_dir, year_ranges=None, country_sets=None,
+                   workers=parallel.MAX_WORKERS, force=False):
+    """Render the missing or outdated states of one dataset.
+
+    Returns (rendered, skipped) state directories.
+    """
+    data = load_dataset(dataset, workers)
+    cube = data["summary"]["cube"]
+    all_countries = sorted(cube.index.get_level_values("Country").unique())
+
+    todo, skipped = [], []
+    for year_range, countries in filter_grid(cube, year_ranges, country_sets):
+        state_dir = os.path.join(out_dir, dataset["slug"], state_name(year_range, countries, all_countries))
+        if not force and is_current(state_dir, data["version"]):
+            skipped.append(state_dir)
+            continue
+        title = (
+            f"{dataset['company']} reviews, {year_range[0]}-{year_range[1]}, "
+            + ", ".join(countries)
+        )
+        todo.append((year_range, countries, state_dir, title))
+
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(todo)),
+            initializer=_init_worker,
+            initargs=(data,),
+        ) as pool:
+            rendered = list(pool.map(_export_state, *zip(*todo)))
+    else:
+        _init_worker(data)
+        rendered = [_export_state(*state) for state in todo]
+    return rendered, skipped
+
+
+def write_bundle_index(out_dir):
+    """Top-level page linking every exported state of every dataset."""
+    parts = ["<h1>Job Reviews EDA: static export</h1>"]
+    for slug in sorted(os.listdir(out_dir)):
+        dataset_dir = os.path.join(out_dir, slug)
+        if not os.path.isdir(dataset_dir):
+            continue
+        parts.append(f"<h2>{html.escape(slug)}</h2><ul>")
+        for state in sorted(os.listdir(dataset_dir)):
+            manifest = _read_manifest(os.path.join(dataset_dir, state))
+            if manifest is None:
+                continue
+            label = (
+                f"{manifest['year_range'][0]}-{manifest['year_range'][1]}: "
+                + ", ".join(manifest["countries"])
+            )
+            parts.append(f'<li><a href="{slug}/{state}/index.html">{html.escape(label)}</a></li>')
+        parts.append("</ul>")
+    parts.append("<h2>Live-only</h2><p>These parts of the dashboard need the live server:</p><ul>")
+    parts.extend(f"<li>{html.escape(item)}</li>" for item in LIVE_ONLY)
+    parts.append("</ul>")
+    _write_page(os.path.join(out_dir, "index.html"), "Job Reviews EDA", parts)
+
+
+def export(out_dir, slug=None, year_ranges=None, country_sets=None,
+           workers=parallel.MAX_WORKERS, force=False):
+    available = {d["slug"]: d for d in datasets.list_datasets()}
+    dataset = available[slug] if slug else next(iter(available.values()))
+
+    os.makedirs(out_dir, exist_ok=True)
+    plotly_js = os.path.join(out_dir, PLOTLY_JS)
+    if not os.path.exists(plotly_js):
+        with open(plotly_js, "w") as f:
+            f.write(plotly.offline.get_plotlyjs())
+
+    rendered, skipped = export_dataset(
+        dataset, out_dir, year_ranges, country_sets, workers, force
+    )
+    write_bundle_index(out_dir)
+    return rendered, skipped
+
+
+def _year_range(spec):
+    start, _, end = spec.partition("-")
+    return int(start), int(end or start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--dataset", help="dataset slug (default: the first registered)")
+    parser.add_argument("--years", action="append", type=_year_range,
+                        help="year range START-END; repeat for several (default: all years)")
+    parser.add_argument("--countries", action="append",
+                        help='"all", "each" or a comma-separated set; repeat for several '
+                             '(default: all and each)')
+    parser.add_argument("--workers", type=int, default=parallel.MAX_WORKERS)
+    parser.add_argument("--force", action="store_true", help="re-render current states too")
+    args = parser.parse_args()
+
+    rendered, skipped = export(
+        args.out_dir, args.dataset, args.years, args.countries, args.workers, args.force
+    )
+    print(f"Rendered {len(rendered)} filter states, {len(skipped)} already current "
+          f"-> {os.path.join(args.out_dir, 'index.html')}")
@@ -0,0 +1,67 @@
+"""
+Size-bounded cache of rendered matplotlib figures.
+
+Heatmaps and word clouds are rendered once per distinct filter state,
+saved as PNG bytes and the figure is closed straight away, so figures no
+longer accumulate in the process. The cache is shared by all sessions and
+evicts least-recently-used images once their total size passes
+``max_bytes``.
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+FIGURE_CACHE_MB = float(os.environ.get("AMAZON_REVIEWS_FIGURE_CACHE_MB", "64"))
+
+
+def figure_to_png(fig, dpi=100):
+    """PNG bytes of `fig`; the figure is closed afterwards."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """LRU of PNG bytes keyed by the parameters the figure was drawn from."""
+
+    def __init__(self, max_bytes=int(FIGURE_CACHE_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()  # sessions run in separate threads
+
+    def __len__(self):
+        return len(self._images)
+
+    def get_or_render(self, key, draw):
+        """Cached PNG for `key`, or render it with ``draw() -> Figure``."""
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
+            self.misses += 1
+
+        png = figure_to_png(draw())
+
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = png
+                self.total_bytes += len(png)
+            self._evict()
+        return png
+
+    def _evict(self):
+        # Always keep the most recent image, even if it alone is too big
+        while self.total_bytes > self.max_bytes and len(self._images) > 1:
+            _, png = self._images.popitem(last=False)
+            self.total_bytes -= len(png)
@@ -0,0 +1,148 @@
+"""
+Incremental ingestion of new review exports.
+
+    python ingest.py new_reviews.csv                  # into the default dataset
+    python ingest.py new_reviews.csv --dataset acme   # into a data pack
+
+The batch is typed like the original export, and reviews whose
+``ID number`` is already in the store (or repeated within the batch) are
+dropped. The rest are appended as a new part of the column store. Every
+derived file is then updated by merging the batch's own aggregates into
+it instead of recomputing it from all reviews:
+
+- the metric cube, correlation statistics, rating histograms,
+  categorical counts and time indexes;
+- the word frequencies and token matrices;
+- the keyword index and the sentiment scores.
+
+Only the batch is parsed and tokenized. The store's version changes, so
+running sessions pick up the merged aggregates on their next rerun and
+read only the new part of the column store.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import data_store
+import datasets
+import parallel
+import search_index
+import sentiment
+import text_pipeline
+import word_index
+
+
+def new_reviews(batch, store_dir=data_store.STORE_DIR):
+    """Rows of a typed batch whose ``ID number`` the store does not hold yet."""
+    if data_store.ID_COL not in batch.columns:
+        raise ValueError(f"The batch has no {data_store.ID_COL!r} column to deduplicate on")
+    known = data_store.read_core([data_store.ID_COL], store_dir)[data_store.ID_COL]
+    batch = batch.drop_duplicates(data_store.ID_COL)
+    return batch[~batch[data_store.ID_COL].isin(known)].reset_index(drop=True)
+
+
+def _texts(batch, column):
+    if column in batch.columns:
+        return batch[column]
+    return pd.Series(pd.NA, index=batch.index, dtype="string")
+
+
+def ingest(batch_csv, store_dir=data_store.STORE_DIR, workers=1):
+    """Append the new reviews of `batch_csv` to a store; returns how many
+    were added."""
+    # The store's version moves before its derived files are rewritten:
+    # datasets.ensure_store takes the same lock, so sessions wait for the
+    # whole ingest instead of rebuilding the aggregates alongside it
+    with data_store.store_lock(store_dir):
+        return _ingest(batch_csv, store_dir, workers)
+
+
+def _ingest(batch_csv, store_dir, workers):
+    batch = new_reviews(data_store.apply_schema(pd.read_csv(batch_csv)), store_dir)
+    if batch.empty:
+        return 0
+
+    # Derived files of the store as it is, read before its version moves on.
+    # The aggregates are written with the store (datasets.ensure_store); they
+    # are only rebuilt from every review for a store made some other way.
+    aggregated = (
+        datasets.load_aggregates(store_dir)
+        or datasets.build_aggregates(store_dir, workers)
+    )
+    tokens = {
+        (col, n): text_pipeline.load_or_build(col, n, store_dir)
+        for col in text_pipeline.TEXT_COLUMNS
+        for n in (1, 2)
+        if text_pipeline.is_persisted(col, n, store_dir)
+    }
+    had_index = search_index.is_persisted(store_dir)
+    had_scores = sentiment.load_scores(store_dir) is not None
+
+    metrics = aggregated["metrics"]
+    for metric in metrics:
+        if metric not in batch.columns:
+            batch[metric] = np.float32(np.nan)
+
+    data_store.append_store(batch, data_store.source_fingerprint(batch_csv), store_dir)
+
+    # The batch's own token counts, shared by word frequencies and matrices
+    ids = batch[data_store.ID_COL].to_numpy()
+    batch_tokens = {
+        (col, n): text_pipeline.build_token_matrix(ids, _texts(batch, col), n=n)
+        for col, n in set(tokens) | {(c, 1) for c in word_index.WORDCLOUD_COLUMNS.values()}
+    }
+
+    datasets.write_aggregates(store_dir, {
+        "metrics": metrics,
+        "summary": aggregates.merge_summaries(
+            aggregated["summary"], aggregates.summarize(batch, metrics)
+        ),
+        "words": word_index.merge_word_index(
+            aggregated["words"],
+            word_index.word_index_from_tokens(batch[aggregates.CELL_KEYS], {
+                col: batch_tokens[(col, 1)] for col in word_index.WORDCLOUD_COLUMNS.values()
+            }),
+        ),
+    })
+
+    merged = {}
+    for (col, n), old in tokens.items():
+        merged[(col, n)] = text_pipeline.append_rows(old, batch_tokens[(col, n)])
+        text_pipeline.save(merged[(col, n)], col, n, store_dir)
+
+    # The index is rebuilt from the merged matrices: no text is re-tokenized
+    if had_index and all((col, 1) in merged for col in search_index.SEARCH_COLUMNS):
+        search_index.save(
+            search_index.build_inverted_index(
+                [merged[(col, 1)] for col in search_index.SEARCH_COLUMNS]
+            ),
+            store_dir,
+        )
+
+    # Scores are keyed by ID: only the new reviews are scored
+    if had_scores:
+        sentiment.load_or_score(store_dir, workers)
+
+    return len(batch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("csv", help="export of new reviews, same columns as the original")
+    parser.add_argument("--dataset", help="dataset slug (default: the first registered)")
+    parser.add_argument("--workers", type=int, default=parallel.MAX_WORKERS)
+    args = parser.parse_args()
+
+    available = {d["slug"]: d for d in datasets.list_datasets()}
+    dataset = available[args.dataset] if args.dataset else next(iter(available.values()))
+    datasets.ensure_store(dataset["csv"], dataset["store"], args.workers)
+
+    added = ingest(args.csv, dataset["store"], args.workers)
+    info = data_store.store_info(dataset["store"]) or {}
+    print(
+        f"Added {added:,} new reviews to {dataset['slug']!r}; "
+        f"the store now holds {info.get('rows', 0):,}"
+    )
@@ -0,0 +1,55 @@
+"""
+Process-pool aggregation engine.
+
+Large review tables are partitioned by Year (or Country) and each
+partition is summarized in a worker process; the partial aggregates are
+then merged exactly with the same functions the streaming loader uses.
+Below ``PARALLEL_ROW_THRESHOLD`` rows the pool start-up costs more than
+it saves, so the summary is built in-process.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import aggregates
+
+PARALLEL_ROW_THRESHOLD = int(os.environ.get("AMAZON_REVIEWS_PARALLEL_ROWS", "1000000"))
+MAX_WORKERS = int(os.environ.get("AMAZON_REVIEWS_WORKERS", "0")) or os.cpu_count()
+
+# Frame shared with each worker once, at start-up; tasks only carry row
+# positions.
+_frame = None
+
+
+def _init_worker(frame):
+    global _frame
+    _frame = frame
+
+
+def _summarize_partition(positions, metrics):
+    return aggregates.summarize(_frame.take(positions), metrics)
+
+
+def build_summary(df, metrics, by="Year", workers=None, threshold=None):
+    """Aggregates of `df`, computed in parallel for large tables."""
+    workers = workers or MAX_WORKERS
+    threshold = PARALLEL_ROW_THRESHOLD if threshold is None else threshold
+    if workers <= 1 or len(df) < threshold:
+        return aggregates.summarize(df, metrics)
+
+    columns = aggregates.CELL_KEYS + list(metrics) + [
+        c for c in aggregates.CATEGORY_COLS + aggregates.EMPLOYMENT_COLS + ["Date"]
+        if c in df.columns
+    ]
+    partitions = list(df.groupby(by, observed=True).indices.values())
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(partitions)),
+        initializer=_init_worker,
+        initargs=(df[columns],),
+    ) as pool:
+        parts = pool.map(
+            _summarize_partition, partitions, [list(metrics)] * len(partitions)
+        )
+        return reduce(aggregates.merge_summaries, parts)
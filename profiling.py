@@ -0,0 +1,136 @@
+"""
+Opt-in timing of dashboard reruns.
+
+Every rerun of app2.py gets a ``RerunProfile``. When profiling is on
+(``AMAZON_REVIEWS_PROFILE=1`` for every session, or the sidebar toggle for
+one session) the named stages of the rerun are timed - data loading,
+filtering, each view's aggregation and each chart build / serialization -
+together with shared-cache and figure-cache hits / misses and the change
+in the process' resident memory. Each rerun is appended as one JSON line
+to ``AMAZON_REVIEWS_PROFILE_LOG`` so p50 / p95 latencies can be tracked
+per view and per triggering widget across sessions. When profiling is off
+the stages cost one attribute check.
+"""
+
+import json
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+import data_store
+
+PROFILE_MODE = os.environ.get("AMAZON_REVIEWS_PROFILE", "0") == "1"
+PROFILE_LOG = os.environ.get(
+    "AMAZON_REVIEWS_PROFILE_LOG", os.path.join(data_store.STORE_DIR, "profile.jsonl")
+)
+
+_log_lock = threading.Lock()  # sessions rerun in separate threads
+
+
+def rss_mb():
+    """Current resident memory of the process (peak where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def changed_widgets(previous, current):
+    """Keys of the widgets whose value differs from the previous rerun."""
+    return sorted(
+        key for key, value in current.items()
+        if key in previous and not _same(previous[key], value)
+    )
+
+
+def _same(a, b):
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return a is b
+
+
+class RerunProfile:
+    """Stage timings of one rerun; a no-op unless `enabled`."""
+
+    def __init__(self, enabled=False, counters=None):
+        self.enabled = enabled
+        self.stages = {}
+        self._counters = counters or {}
+        self._start = time.perf_counter()
+        if enabled:
+            self._rss = rss_mb()
+            self._before = self._read_counters()
+
+    def _read_counters(self):
+        return {
+            name: (cache.hits, cache.misses)
+            for name, cache in self._counters.items()
+        }
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def record(self, view, trigger, session):
+        """The rerun so far as one log entry."""
+        after = self._read_counters()
+        return {
+            "time": time.time(),
+            "session": session,
+            "view": view,
+            "trigger": ", ".join(trigger) or "(none)",
+            "total_s": time.perf_counter() - self._start,
+            "stages": self.stages,
+            "cache": {
+                name: {
+                    "hits": after[name][0] - self._before[name][0],
+                    "misses": after[name][1] - self._before[name][1],
+                }
+                for name in after
+            },
+            "rss_mb": rss_mb(),
+            "rss_delta_mb": rss_mb() - self._rss,
+        }
+
+
+def append_log(entry, path=PROFILE_LOG):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    line = json.dumps(entry)
+    with _log_lock, open(path, "a") as f:
+        f.write(line + "\n")
+
+
+def read_log(path=PROFILE_LOG):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["view", "trigger", "total_s"])
+    return pd.read_json(path, lines=True)
+
+
+def latency_summary(log):
+    """Rerun count, p50 and p95 latency (ms) per view and triggering widget."""
+    if log.empty:
+        return pd.DataFrame(columns=["reruns", "p50_ms", "p95_ms"])
+    grouped = log.groupby(["view", "trigger"])["total_s"]
+    return pd.DataFrame({
+        "reruns": grouped.size(),
+        "p50_ms": grouped.quantile(0.5) * 1000,
+        "p95_ms": grouped.quantile(0.95) * 1000,
+    }).round(1)
+
+
+if __name__ == "__main__":
+    print(latency_summary(read_log()).to_string())
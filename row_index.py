@@ -0,0 +1,134 @@
+"""
+Positional index on (Country, Year) for the sidebar filters.
+
+Row positions are sorted once by (Country, Year) and every cell keeps the
+offset range of its rows in that order. A filter combination resolves to
+a handful of slices of the sorted positions - no full-length boolean
+masks - and tabs get a ``FilteredView`` that copies only the columns
+they actually read. Each row also knows its cell, so an already sorted
+set of positions (e.g. search hits) is narrowed to the filters in
+O(len(positions)) without sorting anything. Rows appended to the frame
+are sorted on their own and merged in cell by cell.
+"""
+
+import numpy as np
+import pandas as pd
+
+INDEX_KEYS = ["Country", "Year"]
+
+
+def build_row_index(df):
+    """Sorted row positions plus {(Country, Year): (start, stop)} offsets,
+    and the cell number of every row."""
+    country = pd.Categorical(df["Country"])
+    year = df["Year"].to_numpy()
+
+    order = np.lexsort((year, country.codes))
+    codes = country.codes[order]
+    years = year[order]
+
+    # Boundaries where either key changes in sorted order
+    change = np.flatnonzero((np.diff(codes) != 0) | (np.diff(years) != 0)) + 1
+    starts = np.concatenate([[0], change])
+    stops = np.concatenate([change, [len(order)]])
+
+    offsets = {
+        (country.categories[codes[a]], int(years[a])): (int(a), int(b))
+        for a, b in zip(starts, stops)
+        if codes[a] >= 0  # rows without a country are never selected
+    }
+    cells = [
+        (country.categories[codes[a]], int(years[a])) if codes[a] >= 0 else None
+        for a in starts
+    ]
+    row_cell = np.empty(len(order), dtype=np.int32)
+    row_cell[order] = np.repeat(np.arange(len(cells), dtype=np.int32), stops - starts)
+    return {"order": order, "offsets": offsets, "cells": cells, "row_cell": row_cell}
+
+
+def _cell_positions(row_index, shift=0):
+    """{cell: [positions]} in sorted order; rows without a country share
+    the None cell."""
+    counts = np.bincount(row_index["row_cell"], minlength=len(row_index["cells"]))
+    stops = np.cumsum(counts)
+    positions = {}
+    for cell, start, stop in zip(row_index["cells"], stops - counts, stops):
+        positions.setdefault(cell, []).append(row_index["order"][start:stop] + shift)
+    return positions
+
+
+def extend_row_index(row_index, df, offset):
+    """The index of `df`, whose rows from position `offset` on were
+    appended after `row_index` was built. Only the new rows are sorted;
+    each cell's positions stay in ascending order."""
+    added = build_row_index(df.iloc[offset:])
+    merged = _cell_positions(row_index)
+    for cell, positions in _cell_positions(added, offset).items():
+        merged.setdefault(cell, []).extend(positions)
+
+    # Same order as a full build: rows without a country first, then by
+    # country code and year
+    categories = pd.Categorical(df["Country"]).categories
+    cells = sorted(
+        merged,
+        key=lambda cell: (-1, 0) if cell is None else (categories.get_loc(cell[0]), cell[1])
+    )
+    sizes = np.array([sum(len(p) for p in merged[cell]) for cell in cells], dtype=np.int64)
+    stops = np.cumsum(sizes)
+
+    number = {cell: i for i, cell in enumerate(cells)}
+    row_cell = np.concatenate([
+        np.array([number[cell] for cell in index["cells"]], dtype=np.int32)[index["row_cell"]]
+        for index in (row_index, added)
+    ])
+    return {
+        "order": np.concatenate([p for cell in cells for p in merged[cell]]),
+        "offsets": {
+            cell: (int(stop - size), int(stop))
+            for cell, size, stop in zip(cells, sizes, stops)
+            if cell is not None
+        },
+        "cells": cells,
+        "row_cell": row_cell,
+    }
+
+
+def select_rows(row_index, year_range, countries):
+    """Positions of the rows inside the filters, grouped by (Country, Year)."""
+    countries = set(countries)
+    order = row_index["order"]
+    slices = [
+        order[a:b]
+        for (country, year), (a, b) in row_index["offsets"].items()
+        if country in countries and year_range[0] <= year <= year_range[1]
+    ]
+    if not slices:
+        return np.empty(0, dtype=order.dtype)
+    return np.concatenate(slices)
+
+
+def keep_rows(row_index, positions, year_range, countries):
+    """The `positions` whose rows fall inside the filters, in their order."""
+    countries = set(countries)
+    selected = np.array([
+        cell is not None and cell[0] in countries and year_range[0] <= cell[1] <= year_range[1]
+        for cell in row_index["cells"]
+    ], dtype=bool)
+    return positions[selected[row_index["row_cell"][positions]]]
+
+
+class FilteredView:
+    """Lazily materialized subset of a frame.
+
+    Nothing is copied until a tab asks for specific columns.
+    """
+
+    def __init__(self, df, positions):
+        self.df = df
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def frame(self, columns):
+        return self.df[list(columns)].take(self.positions)
@@ -0,0 +1,121 @@
+"""
+Inverted index for keyword search over the review text.
+
+Built once from the persisted unigram token matrices of ``pros``,
+``cons`` and ``advice to Management``: the column-compressed (CSC) form
+of the combined review x term matrix *is* a set of sorted posting lists,
+one per term. A query resolves to a few array lookups and sorted-array
+intersections, so it stays in the milliseconds at full corpus size. The
+hits come out sorted, and the (Country, Year) filters are applied to
+them row by row, so nothing is sorted per query.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import data_store
+import text_pipeline
+
+SEARCH_COLUMNS = ["pros", "cons", "advice to Management"]
+INDEX_FILE = "search_index"
+
+
+class InvertedIndex:
+    """Sorted vocabulary plus a CSC review x term matrix of counts."""
+
+    def __init__(self, vocab, postings):
+        self.vocab = np.asarray(vocab, dtype=str)
+        self.postings = sparse.csc_matrix(postings)
+
+    def positions(self, term):
+        """Sorted row positions of the reviews containing `term`."""
+        i = np.searchsorted(self.vocab, term)
+        if i == len(self.vocab) or self.vocab[i] != term:
+            return np.empty(0, dtype=np.int64)
+        start, stop = self.postings.indptr[i], self.postings.indptr[i + 1]
+        return self.postings.indices[start:stop].astype(np.int64)
+
+    def search(self, terms, match_all=False, keep=None):
+        """Sorted positions matching any (or all) `terms`; `keep` optionally
+        narrows them (sorted positions in, a subset out)."""
+        if not terms:
+            return np.empty(0, dtype=np.int64)
+        lists = [self.positions(t) for t in terms]
+        combine = np.intersect1d if match_all else np.union1d
+        hits = lists[0]
+        for postings in lists[1:]:
+            hits = combine(hits, postings)
+        if keep is not None:
+            hits = keep(hits)
+        return hits
+
+    def save(self, path):
+        sparse.save_npz(path + ".npz", self.postings)
+        np.save(path + ".vocab.npy", self.vocab)
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path + ".vocab.npy"), sparse.load_npz(path + ".npz"))
+
+
+def query_terms(query):
+    """Normalize a free-text query exactly like the indexed text."""
+    return list(dict.fromkeys(text_pipeline.tokenize(pd.Series([query])).tolist()))
+
+
+def build_inverted_index(token_matrices):
+    """Merge row-aligned unigram matrices of several columns into one index."""
+    vocab = np.unique(np.concatenate(
+        [t.vocab.astype(str) for t in token_matrices]
+    ))
+    n_rows = len(token_matrices[0])
+
+    combined = sparse.csr_matrix((n_rows, len(vocab)), dtype=np.int32)
+    for tokens in token_matrices:
+        remap = np.searchsorted(vocab, tokens.vocab.astype(str))
+        coo = tokens.matrix.tocoo()
+        combined = combined + sparse.csr_matrix(
+            (coo.data, (coo.row, remap[coo.col])), shape=combined.shape
+        )
+    return InvertedIndex(vocab, combined.tocsc())
+
+
+def _index_path(store_dir):
+    return os.path.join(store_dir, text_pipeline.TOKENS_DIR, INDEX_FILE)
+
+
+def is_persisted(store_dir=data_store.STORE_DIR):
+    path = _index_path(store_dir)
+    return os.path.exists(path + ".npz") and data_store.derived_is_current(path, store_dir)
+
+
+def save(index, store_dir=data_store.STORE_DIR):
+    path = _index_path(store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    index.save(path)
+    data_store.mark_derived(path, store_dir)
+
+
+def load_or_build(store_dir=data_store.STORE_DIR):
+    """Persisted inverted index, rebuilt when the store's source changes."""
+    if is_persisted(store_dir):
+        return InvertedIndex.load(_index_path(store_dir))
+
+    index = build_inverted_index([
+        text_pipeline.load_or_build(col, store_dir=store_dir)
+        for col in SEARCH_COLUMNS
+    ])
+    save(index, store_dir)
+    return index
+
+
+def term_counts_by_year(index, terms, years, keep=None):
+    """Matching reviews per (Year, term) - one posting list per term."""
+    counts = {}
+    for term in terms:
+        hits = index.search([term], keep=keep)
+        counts[term] = pd.Series(years[hits]).value_counts().sort_index()
+    return pd.DataFrame(counts).fillna(0).astype(int).rename_axis("Year")
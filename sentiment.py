@@ -0,0 +1,337 @@
+"""
+Lexicon-based sentiment scores for the review text.
+
+Each review's ``pros``, ``cons`` and ``Comment for company`` are tokenized
+like the rest of the text pipeline, except that negators ("not", "no",
+"never", "don't", ...) are kept, and every token that appears in the
+lexicon contributes its weight. A lexicon word up to ``NEGATION_WINDOW``
+tokens after a negator, in the same clause, contributes the opposite
+weight: "not good at all" scores negative. A text's score is the mean
+weight of its lexicon tokens, from -1 (negative) to +1 (positive), and
+missing when none of its words carry sentiment. ``sentiment`` combines
+the three columns. Scoring is a bincount over each batch's token arrays,
+batches run in a process pool, and the scores are persisted in the store
+keyed by ``ID number``, so a re-run only scores reviews it has not seen:
+
+    python sentiment.py [store_dir]
+
+The built-in lexicon is small and workplace-oriented; point
+``AMAZON_REVIEWS_LEXICON`` at a "word weight" file (e.g. AFINN) to use
+another one.
+"""
+
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import aggregates
+import data_store
+import text_pipeline
+
+SENTIMENT_COLUMNS = ["pros", "cons", "Comment for company"]
+SCORES_FILE = "sentiment.parquet"
+LEXICON_PATH = os.environ.get("AMAZON_REVIEWS_LEXICON")
+# Bump when scoring changes so persisted scores are recomputed
+SCORING_VERSION = "2"
+
+# Flip the polarity of the lexicon words that follow them; they carry no
+# weight of their own. Also spelled without the apostrophe in reviews.
+_CONTRACTIONS = (
+    "aren't can't couldn't didn't doesn't don't hadn't hasn't haven't isn't "
+    "mustn't shan't shouldn't wasn't weren't won't wouldn't"
+).split()
+NEGATORS = sorted(
+    set("cannot hardly never no nor not without".split())
+    | set(_CONTRACTIONS)
+    | {word.replace("'", "") for word in _CONTRACTIONS if word != "won't"}
+)
+NEGATION_WINDOW = 3
+# Punctuation ends a negation's scope: "no perks, great people"
+CLAUSE_PATTERN = r"[.,;:!?()\n]+"
+CLAUSE_BREAK = "||"
+SENTIMENT_STOPWORDS = sorted(set(text_pipeline.STOPWORD_LIST) - set(NEGATORS))
+
+_POSITIVE = {
+    1.0: "amazing awesome best brilliant excellent exceptional fantastic "
+         "incredible love loved outstanding perfect wonderful",
+    0.5: "appreciated balanced better caring clean collaborative comfortable "
+         "competitive decent easy efficient encouraging enjoy enjoyable enjoyed "
+         "exciting fair flexible friendly fun generous glad good great happy "
+         "helpful impressive inclusive innovative interesting kind nice positive "
+         "recognition recommend respectful rewarding safe satisfied secure smart "
+         "solid stable strong supportive talented transparent",
+}
+_NEGATIVE = {
+    -1.0: "abusive awful disgusting hate hated horrible miserable nightmare "
+          "pathetic terrible toxic worst",
+    -0.5: "bad boring burnout chaotic demanding difficult disorganized "
+          "disrespectful exhausting favoritism fired frustrated frustrating "
+          "harsh inconsistent incompetent injuries injury insane lack lacking "
+          "layoffs lousy micromanage micromanagement micromanaging monotonous "
+          "negative overworked pain painful politics poor pressure quit "
+          "repetitive ridiculous rigid rude slow stress stressful strict "
+          "tired tiring turnover underpaid unfair unhappy unorganized unpaid "
+          "unrealistic unsafe useless worse",
+}
+
+
+def builtin_lexicon():
+    return pd.Series({
+        word: weight
+        for table in (_POSITIVE, _NEGATIVE)
+        for weight, words in table.items()
+        for word in words.split()
+    })
+
+
+def read_lexicon(path):
+    """A "word weight" per line lexicon, weights scaled into [-1, 1]."""
+    lexicon = pd.read_csv(
+        path, sep=r"\s+", header=None, names=["word", "weight"],
+        comment="#", engine="python"
+    )
+    weights = lexicon.groupby("word")["weight"].mean()
+    return weights / weights.abs().max()
+
+
+def load_lexicon(path=LEXICON_PATH):
+    lexicon = read_lexicon(path) if path else builtin_lexicon()
+    # Only words the tokenizer can produce, and no negators
+    return lexicon[~lexicon.index.isin(SENTIMENT_STOPWORDS + NEGATORS)].sort_index()
+
+
+def lexicon_digest(lexicon):
+    return hashlib.sha256((SCORING_VERSION + lexicon.to_json()).encode()).hexdigest()
+
+
+def score_name(column):
+    return f"{column} sentiment"
+
+
+# ------------------------------------
+# Scoring
+# ------------------------------------
+def _sentiment_tokens(texts):
+    """(review position, token) arrays in text order, with a
+    ``CLAUSE_BREAK`` token where punctuation ends a clause."""
+    texts = (
+        texts.dropna()
+        .astype("string")
+        .str.replace("\u2019", "'", regex=False)
+        .str.replace(CLAUSE_PATTERN, f" {CLAUSE_BREAK} ", regex=True)
+    )
+    tokens = text_pipeline.tokenize(
+        texts, SENTIMENT_STOPWORDS, f"{text_pipeline.TOKEN_PATTERN}|{re.escape(CLAUSE_BREAK)}"
+    )
+    return tokens.index.to_numpy(), tokens.to_numpy()
+
+
+def negated(rows, codes, vocab, window=NEGATION_WINDOW):
+    """Whether each token (`codes` into `vocab`) follows a negator of the
+    same clause by at most `window` tokens."""
+    vocab = np.asarray(vocab, dtype=object)
+    is_negator = np.isin(vocab, NEGATORS)[codes]
+    starts = np.append(True, rows[1:] != rows[:-1])[:len(rows)]
+    clause = np.cumsum(starts | (vocab == CLAUSE_BREAK)[codes])
+    position = np.arange(len(rows))
+    last = np.maximum.accumulate(np.where(is_negator, position, -1))
+    # The closest negator strictly before each token
+    previous = np.full(len(rows), -1)
+    previous[1:] = last[:-1]
+    return (
+        (previous >= 0)
+        & (clause[np.maximum(previous, 0)] == clause)
+        & (position - previous <= window)
+    )
+
+
+def score_batch(texts, lexicon):
+    """(weight sum, lexicon token count) of every text in one batch."""
+    texts = texts.reset_index(drop=True)
+    total = np.zeros(len(texts))
+    matched = np.zeros(len(texts))
+    if texts.notna().any():
+        rows, tokens = _sentiment_tokens(texts)
+        codes, vocab = pd.factorize(tokens)
+        weights = lexicon.reindex(np.asarray(vocab, dtype=str)).to_numpy()[codes]
+        weights = np.where(negated(rows, codes, vocab), -weights, weights)
+        hit = ~np.isnan(weights)
+        total += np.bincount(rows[hit], weights=weights[hit], minlength=len(texts))
+        matched += np.bincount(rows[hit], minlength=len(texts))
+    return total, matched
+
+
+def _mean_weight(total, matched):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(matched > 0, total / matched, np.nan).astype("float32")
+
+
+def score_reviews(text, columns, lexicon, batch_rows=text_pipeline.BATCH_ROWS, workers=1):
+    """Scores of `text` (``ID number`` plus text columns), one row per review."""
+    tasks = [
+        (col, text[col].iloc[start:start + batch_rows])
+        for col in columns
+        for start in range(0, len(text), batch_rows)
+    ]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            parts = list(pool.map(score_batch, [t[1] for t in tasks], [lexicon] * len(tasks)))
+    else:
+        parts = [score_batch(batch, lexicon) for _, batch in tasks]
+
+    scores = pd.DataFrame({data_store.ID_COL: text[data_store.ID_COL].to_numpy()})
+    total_all, matched_all = np.zeros(len(text)), np.zeros(len(text))
+    for col in columns:
+        col_parts = [p for (c, _), p in zip(tasks, parts) if c == col]
+        total = np.concatenate([p[0] for p in col_parts] + [np.empty(0)])
+        matched = np.concatenate([p[1] for p in col_parts] + [np.empty(0)])
+        scores[score_name(col)] = _mean_weight(total, matched)
+        total_all += total
+        matched_all += matched
+    scores["sentiment"] = _mean_weight(total_all, matched_all)
+    return scores
+
+
+# ------------------------------------
+# Persistence next to the Parquet store
+# ------------------------------------
+def _scores_path(store_dir):
+    return os.path.join(store_dir, SCORES_FILE)
+
+
+def scores_version(store_dir=data_store.STORE_DIR):
+    """Changes whenever the persisted scores are rewritten."""
+    path = _scores_path(store_dir)
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+
+
+def load_scores(store_dir=data_store.STORE_DIR):
+    """Persisted scores keyed by ``ID number``, or None before the first run."""
+    path = _scores_path(store_dir)
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def load_or_score(store_dir=data_store.STORE_DIR, workers=1, lexicon=None):
+    """Scores of every review in the store; only unscored reviews are scored.
+
+    Returns (scores, number of newly scored reviews). A different lexicon
+    re-scores everything.
+    """
+    lexicon = load_lexicon() if lexicon is None else lexicon
+    digest = lexicon_digest(lexicon)
+    path = _scores_path(store_dir)
+
+    scores = None
+    if os.path.exists(path):
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(b"lexicon") == digest.encode():
+            scores = pd.read_parquet(path)
+
+    text_columns = data_store.text_table(store_dir).column_names
+    columns = [c for c in SENTIMENT_COLUMNS if c in text_columns]
+    ids = data_store.read_text([data_store.ID_COL], store_dir)[data_store.ID_COL]
+    new = np.flatnonzero(
+        ~ids.isin(scores[data_store.ID_COL]) if scores is not None else np.ones(len(ids), bool)
+    )
+    if not len(new):
+        return scores, 0
+
+    text = data_store.read_text_rows(new, [data_store.ID_COL] + columns, store_dir)
+    fresh = score_reviews(text, columns, lexicon, workers=workers)
+    scores = fresh if scores is None else pd.concat([scores, fresh], ignore_index=True)
+
+    table = pa.Table.from_pandas(scores, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"lexicon": digest.encode()}
+    )
+    pq.write_table(table, path)
+    return scores, len(new)
+
+
+# ------------------------------------
+# Aggregates for the Sentiment vs Rating view
+# ------------------------------------
+def score_columns(scores):
+    return [c for c in scores.columns if c != data_store.ID_COL]
+
+
+def summarize_sentiment(core, scores, metrics):
+    """Scores next to ratings: a metric cube and correlation statistics
+    over ratings and scores, and score sums per rating value.
+
+    `core` holds ``ID number``, Year, Country and the rating metrics.
+    """
+    frame = core.merge(scores, on=data_store.ID_COL, how="left")
+    score_cols = score_columns(scores)
+    values = list(metrics) + score_cols
+
+    by_rating = {}
+    for metric in metrics:
+        grouped = frame.groupby(aggregates.CELL_KEYS + [metric], observed=True)[score_cols]
+        by_rating[metric] = pd.concat(
+            {"sum": grouped.sum(), "count": grouped.count()}, axis=1
+        ).rename_axis(aggregates.CELL_KEYS + ["value"])
+    by_rating = pd.concat(by_rating, names=["metric"])
+
+    return {
+        "scores": score_cols,
+        "scored": int(frame["sentiment"].notna().sum()),
+        "reviews": len(frame),
+        "cube": aggregates.build_metric_cube(frame, values),
+        "corr": aggregates.build_corr_stats(frame, values),
+        "by_rating": by_rating,
+    }
+
+
+def score_by_rating(summary, year_range, countries, metric, score):
+    """Mean score of reviews giving each rating value, per country."""
+    cells = summary["by_rating"].xs(metric, level="metric")
+    cells = aggregates.select_cells(cells, year_range, countries)
+    totals = cells.groupby(level=["Country", "value"]).sum()
+    mean = totals["sum"][score] / totals["count"][score].where(totals["count"][score] > 0)
+    return pd.DataFrame({"Mean score": mean, "Reviews": totals["count"][score]}).reset_index()
+
+
+def yearly_score_and_rating(summary, year_range, countries, metric, score):
+    """Mean score and mean rating per (Year, Country)."""
+    cells = aggregates.select_cells(summary["cube"], year_range, countries)
+    return aggregates.reduce_cells(cells, [metric, score], aggregates.CELL_KEYS)["mean"].reset_index()
+
+
+def score_rating_correlation(summary, year_range, countries, metric, score):
+    """Pearson correlation of score and rating for each (Year, Country)."""
+    cells = [
+        (year, country) for year, country in summary["corr"]["cells"]
+        if year_range[0] <= year <= year_range[1] and country in set(countries)
+    ]
+    corr = {
+        (year, country): aggregates.corr_from_stats(
+            summary["corr"], (year, year), [country], [metric, score]
+        ).iloc[0, 1]
+        for year, country in sorted(cells)
+    }
+    return (
+        pd.Series(corr, dtype="float64").rename_axis(["Year", "Country"])
+        .unstack("Country")
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    import parallel
+
+    store_dir = sys.argv[1] if len(sys.argv) > 1 else data_store.STORE_DIR
+    if store_dir == data_store.STORE_DIR:
+        data_store.ensure_store()
+    scores, scored = load_or_score(store_dir, workers=parallel.MAX_WORKERS)
+    print(
+        f"Scored {scored:,} new reviews; {scores['sentiment'].notna().sum():,} of "
+        f"{len(scores):,} have a sentiment score ({store_dir!r})"
+    )
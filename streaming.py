@@ -0,0 +1,63 @@
+"""
+Single-pass, bounded-memory ingestion for review exports larger than RAM.
+
+The CSV is read in chunks; each chunk is folded into the same aggregates
+the dashboard uses (metric cube, correlation statistics, rating
+histograms, categorical counts and word frequencies) and then discarded.
+Memory is bounded by the size of the aggregates (years x countries x
+metrics, plus the vocabulary), not by the number of reviews.
+
+Enable it for the dashboard with ``AMAZON_REVIEWS_STREAMING=1``.
+"""
+
+import os
+
+import pandas as pd
+
+import aggregates
+import data_store
+import word_index
+
+STREAMING_MODE = os.environ.get("AMAZON_REVIEWS_STREAMING", "0") == "1"
+CHUNK_ROWS = int(os.environ.get("AMAZON_REVIEWS_CHUNK_ROWS", "200000"))
+
+
+def summarize_chunk(chunk, metrics, text_columns):
+    """Aggregates of one chunk of (schema-applied) reviews."""
+    summary = aggregates.summarize(chunk, metrics)
+    summary["words"] = word_index.build_word_index(
+        chunk[aggregates.CELL_KEYS], chunk, text_columns
+    )
+    return summary
+
+
+def merge_summaries(total, part):
+    if total is None:
+        return part
+    merged = aggregates.merge_summaries(total, part)
+    merged["words"] = word_index.merge_word_index(total["words"], part["words"])
+    return merged
+
+
+def stream_aggregates(csv_path=data_store.DATA_CSV, chunk_rows=CHUNK_ROWS):
+    """Fold the whole CSV into dashboard aggregates, one chunk at a time."""
+    total = None
+    metrics = None
+    text_columns = list(word_index.WORDCLOUD_COLUMNS.values())
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        chunk = data_store.apply_schema(chunk)
+
+        # The metric set is fixed by the first chunk; later chunks are
+        # coerced to it (an all-empty column may be read as text).
+        if metrics is None:
+            metrics = [
+                c for c in chunk.select_dtypes(include="number").columns
+                if c not in data_store.NON_METRIC_NUMERIC
+            ]
+        chunk[metrics] = chunk[metrics].apply(pd.to_numeric, errors="coerce")
+
+        part = summarize_chunk(chunk, metrics, text_columns)
+        total = merge_summaries(total, part)
+
+    return total
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregates
+
+METRICS = ["Overall rating", "Work/Life Balance", "Culture & Values", "Constant"]
+
+
+@pytest.fixture
+def reviews():
+    rng = np.random.default_rng(0)
+    n = 3000
+    overall = rng.integers(1, 6, n).astype("float64")
+    df = pd.DataFrame({
+        "Year": rng.integers(2010, 2016, n),
+        "Country": rng.choice(["USA", "India", "UK"], n),
+        "Overall rating": overall,
+        "Work/Life Balance": np.clip(overall + rng.integers(-1, 2, n), 1, 5),
+        "Culture & Values": rng.integers(1, 6, n).astype("float64"),
+        "Constant": np.full(n, 3.0),
+    })
+    # Missing values that differ per column, so pairs have different n
+    df.loc[rng.random(n) < 0.2, "Work/Life Balance"] = np.nan
+    df.loc[rng.random(n) < 0.4, "Culture & Values"] = np.nan
+    return df
+
+
+def test_corr_from_stats_matches_dataframe_corr(reviews):
+    stats = aggregates.build_corr_stats(reviews, METRICS)
+    result = aggregates.corr_from_stats(stats, (2010, 2015), ["USA", "India", "UK"], METRICS)
+    pd.testing.assert_frame_equal(result, reviews[METRICS].corr(), atol=1e-12, rtol=0)
+
+
+def test_corr_from_stats_matches_on_a_filtered_subset(reviews):
+    stats = aggregates.build_corr_stats(reviews, METRICS)
+    metrics = ["Culture & Values", "Overall rating"]
+    result = aggregates.corr_from_stats(stats, (2011, 2013), ["India"], metrics)
+
+    selected = reviews[reviews["Year"].between(2011, 2013) & (reviews["Country"] == "India")]
+    pd.testing.assert_frame_equal(result, selected[metrics].corr(), atol=1e-12, rtol=0)
+
+
+def test_merged_partitions_match_the_whole_table(reviews):
+    shuffled = reviews.sample(frac=1, random_state=1)
+    parts = [shuffled.iloc[i::4] for i in range(4)]
+    stats = aggregates.build_corr_stats(parts[0], METRICS)
+    for part in parts[1:]:
+        stats = aggregates.merge_corr_stats(stats, aggregates.build_corr_stats(part, METRICS))
+
+    result = aggregates.corr_from_stats(stats, (2010, 2015), ["USA", "India", "UK"], METRICS)
+    pd.testing.assert_frame_equal(result, reviews[METRICS].corr(), atol=1e-12, rtol=0)
+
+
+def test_constant_column_has_no_correlation(reviews):
+    stats = aggregates.build_corr_stats(reviews, METRICS)
+    result = aggregates.corr_from_stats(stats, (2010, 2015), ["USA"], METRICS)
+    assert result["Constant"].isna().all()
+    assert result.loc["Constant"].isna().all()
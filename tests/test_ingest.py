@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_store
+import datasets
+import ingest
+import search_index
+import sentiment
+from benchmarks import synthetic
+
+
+def assert_same(result, expected, path="aggregates"):
+    """Nested dicts of frames, series and arrays are equal, up to float
+    rounding from summing in a different order."""
+    if isinstance(expected, dict):
+        assert result.keys() == expected.keys(), path
+        for key in expected:
+            assert_same(result[key], expected[key], f"{path}[{key!r}]")
+    elif isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, obj=path)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(result, expected, check_exact=False, obj=path)
+    elif isinstance(expected, np.ndarray) and expected.dtype.kind == "f":
+        np.testing.assert_allclose(result, expected, err_msg=path)
+    elif isinstance(expected, np.ndarray):
+        np.testing.assert_array_equal(result, expected, err_msg=path)
+    else:
+        assert result == expected, path
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """A store after an ingest, and one built from the same reviews at once."""
+    rng = np.random.default_rng(0)
+    pools = synthetic.phrase_pools(rng, size=300)
+    first = synthetic.generate_chunk(rng, 0, 2000, pools)
+    more = synthetic.generate_chunk(rng, 2000, 400, pools)
+    more.loc[:49, "Country"] = "UK"  # cells the store has no row in yet
+    # IDs the store already holds, and IDs repeated within the batch
+    batch = pd.concat([more, first.iloc[:30], more.iloc[100:120]], ignore_index=True)
+
+    paths = {name: str(tmp_path / f"{name}.csv") for name in ("first", "batch", "all")}
+    first.to_csv(paths["first"], index=False)
+    batch.to_csv(paths["batch"], index=False)
+    pd.concat([first, more]).to_csv(paths["all"], index=False)
+
+    ingested, fresh = str(tmp_path / "ingested"), str(tmp_path / "fresh")
+    datasets.ensure_store(paths["first"], ingested)
+    search_index.load_or_build(ingested)
+    sentiment.load_or_score(ingested)
+    assert ingest.ingest(paths["batch"], ingested) == len(more)
+
+    datasets.ensure_store(paths["all"], fresh)
+    return ingested, fresh
+
+
+def test_merged_aggregates_match_a_full_build(stores):
+    ingested, fresh = stores
+    assert datasets.aggregates_are_current(ingested)
+    assert_same(datasets.load_aggregates(ingested), datasets.build_aggregates(fresh))
+
+
+def test_search_hits_and_scores_cover_the_new_reviews(stores):
+    ingested, fresh = stores
+    assert search_index.is_persisted(ingested)
+    index, expected = search_index.load_or_build(ingested), search_index.load_or_build(fresh)
+    for term in ["pay", "stress", "training", "culture"]:
+        np.testing.assert_array_equal(index.positions(term), expected.positions(term))
+
+    ids = data_store.read_text([data_store.ID_COL], ingested)[data_store.ID_COL]
+    scores, added = sentiment.load_or_score(ingested)
+    assert added == 0
+    assert sorted(scores[data_store.ID_COL]) == sorted(ids)
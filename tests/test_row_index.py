@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_store
+import row_index
+
+
+def frame(n, seed, countries):
+    rng = np.random.default_rng(seed)
+    country = pd.Series(rng.choice(countries, n)).astype("category")
+    country[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({"Country": country, "Year": rng.integers(2010, 2016, n).astype("int16")})
+
+
+@pytest.fixture
+def frames():
+    # The appended rows bring a country and a year the first part lacks
+    first = frame(2000, 0, ["USA", "India"])
+    more = frame(300, 1, ["USA", "India", "UK"])
+    more.loc[:9, "Year"] = 2020
+    return first, more
+
+
+def test_extended_index_matches_a_full_build(frames):
+    first, more = frames
+    whole = data_store.append_frame(first, more)
+    extended = row_index.extend_row_index(row_index.build_row_index(first), whole, len(first))
+    built = row_index.build_row_index(whole)
+
+    assert extended["offsets"] == built["offsets"]
+    for a, b in built["offsets"].values():
+        np.testing.assert_array_equal(extended["order"][a:b], built["order"][a:b])
+    for year_range, countries in [((2010, 2020), ["USA", "India", "UK"]), ((2012, 2013), ["UK"])]:
+        np.testing.assert_array_equal(
+            row_index.select_rows(extended, year_range, countries),
+            row_index.select_rows(built, year_range, countries),
+        )
+        positions = np.arange(0, len(whole), 3)
+        np.testing.assert_array_equal(
+            row_index.keep_rows(extended, positions, year_range, countries),
+            row_index.keep_rows(built, positions, year_range, countries),
+        )
+
+
+def test_append_frame_keeps_categories(frames):
+    first, more = frames
+    whole = data_store.append_frame(first, more)
+    assert isinstance(whole["Country"].dtype, pd.CategoricalDtype)
+    assert whole["Country"].astype(object).equals(
+        pd.concat([first["Country"].astype(object), more["Country"].astype(object)], ignore_index=True)
+    )
+    assert list(first["Country"].cat.categories) == ["India", "USA"]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sentiment
+
+
+@pytest.fixture
+def lexicon():
+    return sentiment.load_lexicon(None)
+
+
+def scores(texts, lexicon):
+    total, matched = sentiment.score_batch(pd.Series(texts, dtype="string"), lexicon)
+    return sentiment._mean_weight(total, matched)
+
+
+@pytest.mark.parametrize("text", [
+    "not good at all",
+    "no work life balance, not fair",
+    "The pay isn't great",
+    "I don't enjoy the job",
+    "management is never helpful",
+    "they dont recommend it",
+])
+def test_negated_positive_words_score_negative(text, lexicon):
+    assert scores([text], lexicon)[0] < 0
+
+
+def test_negated_negative_words_score_positive(lexicon):
+    assert scores(["not bad", "no stress and not boring"], lexicon).tolist() == [0.5, 0.5]
+
+
+def test_negation_stops_at_punctuation_and_after_the_window(lexicon):
+    result = scores([
+        "no free food. Great team",
+        "no free food or parking for the great team",
+        "good people",
+    ], lexicon)
+    assert result.tolist() == [0.5, 0.5, 0.5]
+
+
+def test_negators_carry_no_weight(lexicon):
+    assert not lexicon.index.isin(sentiment.NEGATORS).any()
+    assert np.isnan(scores(["not really", None], lexicon)).all()
@@ -0,0 +1,220 @@
+"""
+Vectorized tokenization of the review text columns.
+
+Every text column is lowercased and tokenized with pandas string methods
+(no Python loop per review), stopwords are dropped, and unigram / bigram
+counts are stored as sparse review x term matrices whose rows are keyed
+by ``ID number``. Text is processed in batches, optionally across a
+process pool, and the matrices are persisted next to the Parquet store so
+the Word Clouds tab and any keyword or trend view share one tokenization
+pass.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from wordcloud import STOPWORDS
+
+import data_store
+
+TEXT_COLUMNS = [
+    "pros",
+    "cons",
+    "advice to Management",
+    "Comment for company",
+]
+
+TOKEN_PATTERN = r"[a-z]+(?:'[a-z]+)*"
+STOPWORD_LIST = sorted(STOPWORDS)
+BATCH_ROWS = 50_000
+
+TOKENS_DIR = "tokens"
+
+
+def tokenize(texts, stopwords=STOPWORD_LIST, pattern=TOKEN_PATTERN):
+    """One row per token, indexed by the position of its review.
+
+    `texts` is a Series of review strings; missing reviews produce no
+    tokens. Possessive "'s" is stripped and `stopwords` / single letters
+    are removed.
+    """
+    tokens = (
+        texts.dropna()
+        .astype("string")
+        .str.lower()
+        .str.findall(pattern)
+        .explode()
+        .dropna()
+        .astype("string")
+    )
+    tokens = tokens.str.replace(r"'s$", "", regex=True)
+    keep = ~tokens.isin(stopwords) & (tokens.str.len() > 1)
+    return tokens[keep]
+
+
+def ngrams(tokens, n):
+    """Unigrams (n=1) or adjacent-token bigrams (n=2) within each review."""
+    if n == 1:
+        return tokens
+    following = tokens.shift(-1)
+    same_review = tokens.index.to_numpy()[:-1] == tokens.index.to_numpy()[1:]
+    same_review = np.append(same_review, False)
+    return (tokens + " " + following)[same_review]
+
+
+def count_batch(texts, n):
+    """(row positions, term ids, counts, vocabulary) for one batch."""
+    terms = ngrams(tokenize(texts), n)
+    counts = terms.groupby([terms.index, terms.to_numpy()]).size()
+    rows = counts.index.get_level_values(0).to_numpy()
+    codes, vocab = pd.factorize(counts.index.get_level_values(1))
+    return rows, codes, counts.to_numpy(), np.asarray(vocab, dtype=object)
+
+
+class TokenMatrix:
+    """Sparse review x term counts with the review ids and vocabulary."""
+
+    def __init__(self, ids, vocab, matrix):
+        self.ids = np.asarray(ids)
+        self.vocab = np.asarray(vocab, dtype=object)
+        self.matrix = sparse.csr_matrix(matrix)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def term_counts(self, rows=None):
+        """Total count of each term over `rows` (all reviews by default)."""
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        totals = np.asarray(matrix.sum(axis=0)).ravel()
+        present = np.flatnonzero(totals)
+        return pd.Series(totals[present], index=self.vocab[present])
+
+    def save(self, path):
+        sparse.save_npz(path + ".npz", self.matrix)
+        np.save(path + ".ids.npy", self.ids)
+        np.save(path + ".vocab.npy", self.vocab.astype(str))
+
+    @classmethod
+    def load(cls, path):
+        return cls(
+            np.load(path + ".ids.npy"),
+            np.load(path + ".vocab.npy").astype(object),
+            sparse.load_npz(path + ".npz"),
+        )
+
+
+def _batches(texts, batch_rows):
+    for start in range(0, len(texts), batch_rows):
+        yield texts.iloc[start:start + batch_rows]
+
+
+def build_token_matrix(ids, texts, n=1, batch_rows=BATCH_ROWS, workers=1):
+    """Count n-grams of `texts` (row-aligned with `ids`) in batches."""
+    texts = pd.Series(np.asarray(texts, dtype=object))
+    batches = list(_batches(texts, batch_rows))
+
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(count_batch, batches, [n] * len(batches)))
+    else:
+        parts = [count_batch(batch, n) for batch in batches]
+
+    # Merge the batch-local vocabularies into one
+    vocab, inverse = np.unique(
+        np.concatenate([p[3] for p in parts] + [np.empty(0, dtype=object)]).astype(str),
+        return_inverse=True,
+    )
+    rows, cols, data = [], [], []
+    offset = 0
+    for batch_rows_, codes, counts, batch_vocab in parts:
+        rows.append(batch_rows_)
+        cols.append(inverse[offset:offset + len(batch_vocab)][codes])
+        data.append(counts)
+        offset += len(batch_vocab)
+
+    matrix = sparse.csr_matrix(
+        (
+            np.concatenate(data + [np.empty(0, dtype=np.int64)]),
+            (
+                np.concatenate(rows + [np.empty(0, dtype=np.int64)]),
+                np.concatenate(cols + [np.empty(0, dtype=np.int64)]),
+            ),
+        ),
+        shape=(len(texts), len(vocab)),
+        dtype=np.int32,
+    )
+    return TokenMatrix(ids, vocab.astype(object), matrix)
+
+
+def append_rows(tokens, more):
+    """`tokens` followed by the rows of `more`.
+
+    Terms new to `tokens` are added after its vocabulary, so its own
+    entries keep their column ids and only `more` is remapped.
+    """
+    old_vocab = tokens.vocab.astype(str)
+    more_vocab = more.vocab.astype(str)
+    added = np.setdiff1d(more_vocab, old_vocab)
+    vocab = np.concatenate([old_vocab, added])
+
+    order = np.argsort(vocab)
+    columns = order[np.searchsorted(vocab, more_vocab, sorter=order)]
+    coo = more.matrix.tocoo()
+    shape = (len(more), len(vocab))
+    head = sparse.csr_matrix(
+        (tokens.matrix.data, tokens.matrix.indices, tokens.matrix.indptr),
+        shape=(len(tokens), len(vocab)),
+    )
+    tail = sparse.csr_matrix((coo.data, (coo.row, columns[coo.col])), shape=shape)
+    return TokenMatrix(
+        np.concatenate([tokens.ids, more.ids]),
+        vocab.astype(object),
+        sparse.vstack([head, tail], format="csr"),
+    )
+
+
+# ------------------------------------
+# Persistence next to the Parquet store
+# ------------------------------------
+def _matrix_path(column, n, store_dir):
+    name = column.replace(" ", "_").lower()
+    return os.path.join(store_dir, TOKENS_DIR, f"{name}.{n}gram")
+
+
+def is_persisted(column, n=1, store_dir=data_store.STORE_DIR):
+    """Whether a current token matrix of `column` is on disk."""
+    path = _matrix_path(column, n, store_dir)
+    return os.path.exists(path + ".npz") and data_store.derived_is_current(path, store_dir)
+
+
+def save(tokens, column, n=1, store_dir=data_store.STORE_DIR):
+    path = _matrix_path(column, n, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tokens.save(path)
+    data_store.mark_derived(path, store_dir)
+
+
+def load_or_build(column, n=1, store_dir=data_store.STORE_DIR, workers=1):
+    """Token matrix of a text column, built once per version of the store."""
+    if is_persisted(column, n, store_dir):
+        return TokenMatrix.load(_matrix_path(column, n, store_dir))
+
+    text = data_store.read_text([data_store.ID_COL, column], store_dir)
+    tokens = build_token_matrix(
+        text[data_store.ID_COL].to_numpy(), text[column], n=n, workers=workers
+    )
+    save(tokens, column, n, store_dir)
+    return tokens
+
+
+if __name__ == "__main__":
+    import parallel
+
+    data_store.ensure_store()
+    for column in TEXT_COLUMNS:
+        for n in (1, 2):
+            tokens = load_or_build(column, n, workers=parallel.MAX_WORKERS)
+            print(f"{column!r} {n}-grams: {len(tokens.vocab):,} terms")
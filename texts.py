@@ -0,0 +1,243 @@
+"""
+Written text of the dashboard: page introductions, the column glossary
+and the hand-written commentary on the default (Amazon) dataset.
+
+app2.py shows it next to the live views and ``export.py`` writes the same
+text into every exported filter state. The commentary only describes the
+export it was written for; datasets whose ``narrative`` flag is off show
+the generic text alone.
+"""
+
+
+def period(info):
+    """' from <first> to <last>' for a store's info, else nothing."""
+    if not info.get("first_year"):
+        return ""
+    return f" from {info['first_year']} to {info['last_year']}"
+
+
+def coverage(info):
+    if not info.get("countries"):
+        return ""
+    return f"Our Data is exclusively from employees in {' and '.join(info['countries'])}."
+
+
+# ------------------------------------
+# Home and Data Description
+# ------------------------------------
+def home(company, period):
+    return f"""
+        This interactive dashboard allows you to explore employee reviews of {company}{period} across different countries.
+        
+        Our dataset includes various job satisfaction metrics such as Overall Rating, Work-Life Balance, Compensation & Benefits, Career Opportunities, Culture & Values, and Senior Management.
+
+        Use the sidebar to filter data by year range, countries, and specific rating metrics. Navigate through the tabs to view different visualizations and analyses.
+
+        The Dropdown allows you to select specific metrics you wish to visualize which will be useful for analysis across a few specific metrics 
+            """
+
+
+def overview(company, period):
+    return f"""
+        **Data Source:** The dataset is sourced from publicly available employee reviews gathered from Glassdoor
+
+        The dataset contains employee reviews of {company}{period} across multiple countries. Each review includes various job satisfaction metrics rated on a scale, along with written feedback in the form of pros, cons, and advice to management.
+        
+        The following are the main columns/metrics in the dataset:
+        """
+
+
+def column_descriptions(company, coverage):
+    return f"""
+### Column Descriptions
+
+- **ID number (Integer):** Unique identifier for each review.  
+- **Date (Character):** Date of the review (day–month–year format).  
+- **Location (Character):** Job location (city/state/country).  
+- **Position (Character):** Employee’s job title/role.  
+- **Comment for company (Character):** Overall textual comment summarizing the review.  
+- **Overall rating (Numeric):** Overall satisfaction rating (1–5).  
+- **Work/Life Balance (Numeric):** Rating for work–life balance (1–5).  
+- **Culture & Values (Numeric):** Rating for company culture and values (1–5).  
+- **Diversity & Inclusion (Numeric):** Rating for diversity and inclusion (1–5, limited data available).  
+- **Career Opportunities (Numeric):** Rating for growth and career opportunities (1–5).  
+- **Compensation and Benefits (Numeric):** Rating for pay and benefits (1–5).  
+- **Senior Management (Numeric):** Rating for management quality (1–5).  
+- **CEO Approval (Character):** Whether employees approve of the CEO (yes, no, may be).  
+- **Recommended (Character):** Whether the reviewer recommends {company} as a workplace.  
+- **Business Outlook (Character):** Reviewer’s perception of the company’s future (positive, negative, neutral).  
+- **Current employee (Boolean):** Whether the reviewer is a current employee.  
+- **Former employee (Boolean):** Whether the reviewer is a former employee.  
+- **Timeline (Character):** Employment timeline (tenure period where available).  
+- **cons (Character):** Reported disadvantages of working at {company}.  
+- **pros (Character):** Reported advantages of working at {company}.  
+- **advice to Management (Character):** Suggestions for company leadership.  
+- **review_url (Character):** Link to the original Glassdoor review.
+                
+{coverage}
+                
+Below you can find an interactive pie chart showing the distribution of reviews by country across the entire dataset:
+"""
+
+
+def no_conclusions(company):
+    return (
+        f"No written conclusions have been added for the {company} dataset yet; "
+        "every other view is computed from its reviews."
+    )
+
+
+# ------------------------------------
+# Commentary on the default dataset
+# ------------------------------------
+YEARLY_INSIGHTS = """
+        ***Key Insights:***
+
+The year-wise averages (2008–2020) reveal several important trends in Amazon employee reviews:
+
+• Overall Rating increased steadily from ~3.25 in 2008 to ~3.7 by 2020. This reflects a long-term
+improvement in employee sentiment, despite short-term dips during Amazon’s rapid expansion years.
+
+• Work–Life Balance consistently lagged behind other metrics. It declined below 3.0 between 2010–
+2015 (lowest in 2013), highlighting the intensity of Amazon’s work culture during its high-growth phase.
+Although it recovered slightly in later years, it remained the weakest dimension overall.
+
+• Career Opportunities and Compensation & Benefits showed strong upward trends, especially
+after 2012. By 2020 both exceeded 3.8, suggesting that Amazon’s rapid growth, market dominance,
+and pay improvements boosted employee perceptions of growth potential and rewards.
+
+• Senior Management dipped in the mid-2010s (2013–2015), coinciding with public criticism of Amazon’s demanding workplace culture (e.g., the 2015 New York Times article). Ratings improved afterwards, indicating gradual adaptation in leadership and communication practices.
+
+Employee sentiment at Amazon became more positive over the 12-year span. Compensation and career
+growth opportunities emerged as the strongest drivers of improvement, while work–life balance and
+management quality remained areas of concern. The data portrays Amazon as a workplace offering
+excellent financial and professional incentives, but often at the cost of personal time and wellbeing.
+We also lack any data that rates culture and values before 2012 which shows that the metric was not taken
+into consideration pre-2012 as well as lacking all data regarding"""
+
+CORRELATION_INSIGHTS = """
+    **Key Insights from the Correlation Analysis**
+
+    • Overall Rating shows strong positive relationships with all other metrics, indicating that employees’ overall satisfaction reflects multiple aspects of their work experience.
+
+    • Senior Management and Work–Life Balance are closely linked, suggesting that effective leadership is associated with better work–life outcomes.
+
+    • Compensation & Benefits and Career Opportunities are important contributors to overall satisfaction, highlighting the role of tangible rewards and growth prospects.
+
+    • While most metrics move together, leadership quality and work–life balance appear especially influential in shaping employees’ broader perception of the company.
+    """
+
+COUNTRY_TAKEAWAYS = """
+    **Key Takeaways**
+
+    **US reviews** appear more **stable** across metrics, while **Indian reviews** show **greater variability**.
+
+    By the late 2010s, ratings across countries converge, potentially reflecting improvements in global HR practices and evolving workplace conditions.
+    
+    **More general trends in every metric on an individual basis are as follows:**
+    
+    • **Overall Satisfaction:** Ratings in both India and the USA improve steadily over time and converge by 2020, though India shows greater variability in individual experiences.
+
+    • **Career Opportunities:** Both countries rate career growth positively. Trends are steadier in the USA, while India exhibits more fluctuation before recovering in later years.
+
+    • **Compensation & Benefits:** Ratings trend upward in both regions, with very similar central tendencies, indicating broadly comparable perceptions of compensation.
+
+    • **Culture & Values:** Cultural alignment is rated more favorably in the USA, with both countries showing temporary declines in the early 2010s followed by recovery.
+
+    • **Senior Management:** Leadership is consistently among the lower-rated dimensions in both countries, though perceptions improve modestly after the mid-2010s.
+
+    • **Work–Life Balance:** This remains the weakest-rated metric across regions, with only gradual improvement in recent years and substantial variability throughout.
+    """
+
+MULTIVARIABLE_INSIGHTS = """
+    **Year-wise Averages: Key Insights (2008–2020)**
+
+    • **Overall Rating:** Shows a steady long-term increase, indicating gradual improvement in employee sentiment despite short-term fluctuations during expansion phases.
+
+    • **Work–Life Balance:** Declines in the early 2010s before stabilizing, suggesting sustained pressure during Amazon’s high-growth period with limited recovery.
+
+    • **Career Opportunities & Compensation:** Both metrics improve markedly after 2012, reflecting stronger perceptions of growth opportunities and financial incentives.
+
+    • **Senior Management:** Experiences a mid-2010s decline followed by recovery, aligning with periods of public scrutiny and subsequent organizational adjustments.
+
+    Overall, compensation and career growth emerge as the strongest areas of improvement, while work–life balance and leadership remain persistent concerns.
+    """
+
+COVID_INSIGHTS = """
+    **Impact of COVID-19 on Employee Sentiment (Pre- vs Post-2019)**
+
+    • **Overall Rating:** Increases during the pandemic, suggesting slightly more positive overall perceptions despite challenging conditions.
+
+    • **Work–Life Balance:** Improves modestly, likely influenced by remote or hybrid work arrangements and increased flexibility.
+
+    • **Career Opportunities:** Shows noticeable improvement, potentially driven by rapid expansion in logistics, cloud services, and related sectors.
+
+    • **Compensation & Benefits:** Trends upward, reflecting pay raises, bonuses, and additional benefits introduced during the pandemic.
+
+    • **Senior Management:** Improves relative to pre-pandemic years, indicating greater approval of leadership decisions during crisis management.
+
+    Collectively, the COVID-19 period does not appear to negatively impact internal employee sentiment. Instead, ratings suggest a neutral to mildly positive effect on overall satisfaction.
+    """
+
+# Under the Country-wise box plot, by metric
+METRIC_CONCLUSIONS = {
+    "Overall Rating": "Overall ratings are higher in the USA, while India shows more variability.",
+    "Work-Life Balance": "Work-life balance ratings are more tightly clustered in the USA.",
+    "Compensation & Benefits": "Compensation ratings are generally higher in the USA with fewer low outliers.",
+    "Career Opportunities": "Both countries show similar medians, but India has wider dispersion.",
+    "Culture & Values": "Cultural ratings are balanced, with fewer extreme lows in the USA.",
+    "Senior Management": "Management ratings show greater polarization in India."
+}
+
+# Under each word cloud, by (country, review type)
+WORDCLOUD_INSIGHTS = {
+    ("USA", "Pros"):
+        "Positive reviews from the USA frequently emphasize pay, benefits,work environment and team. \n This shows a general appreciation of the internal work culture and the financial compensation at Amazon",
+
+    ("USA", "Cons"):
+        "Negative feedback from the USA commonly highlights words like work, rime, people and manager showing concerns about work-life balance, work intensity and management issues which can be areas of potential growth.",
+
+    ("USA", "Advice to Management"):
+        "Advice from US employees often focuses on words like manager,time,team and management showing there exists a need for improving leadership communication and sustaining employee well-being.",
+
+    ("India", "Pros"):
+        "Indian employees frequently highlight pay,work and benefits suggesting Indian employees mostly agree with their US counterparts regarding the strongpoints of being employed at Amazon ",
+
+    ("India", "Cons"):
+        "Concerns from Indian reviews shows words like work, time,hour break and long suggesting the cons often center around demanding work culture and long hourse.",
+
+    ("India", "Advice to Management"):
+        "Advice from Indian employees includes words like better, manager, time and management which suggests a demand for improving people management, workload distribution, and overall team support."
+}
+
+CONCLUSIONS_INTRO = """
+        This section summarizes the key insights drawn from employee reviews of Amazon
+        across time periods and regions, combining quantitative ratings and qualitative feedback.
+        """
+
+CONCLUSIONS = """
+        **Key Findings**
+
+        • Employee sentiment at Amazon is shaped by both **temporal changes** and **regional context**. 
+        Ratings generally improve over time, with noticeable dips during high-growth phases and recovery in later years.
+
+        • **Compensation and Career Opportunities** emerge as Amazon’s strongest aspects globally, showing consistent improvement
+        and contributing positively to overall satisfaction.
+
+        • **Work–Life Balance and Senior Management** remain persistent areas of concern across regions, despite partial improvements after 2016.
+
+        • Reviews from the **USA** tend to be more stable and consistent, particularly in compensation and culture,
+        while **Indian reviews** exhibit greater variability, reflecting more diverse employee experiences.
+
+        • Qualitative feedback reinforces these patterns, highlighting workload intensity, leadership challenges,
+        and work–life balance as recurring themes, alongside appreciation for growth opportunities and pay.
+
+        • Overall, Amazon is perceived as a **career accelerator** that offers strong professional and financial rewards,
+        but sustaining employee satisfaction over time will require continued attention to workload management
+        and leadership quality.
+        """
+
+CONCLUSIONS_CAPTION = (
+    "These conclusions are based on aggregated trends from 2008–2020 and should be interpreted in the context "
+    "of review volume, regional differences, and evolving organizational practices."
+)
@@ -0,0 +1,71 @@
+"""
+Pre-tokenized word frequencies for the Word Clouds tab.
+
+Word counts are kept per (Year, Country, text column) cell, summed from
+the shared unigram token matrices (see ``text_pipeline``), with STOPWORDS
+already removed. A word cloud for any filter combination is then drawn
+from the merged counters via ``WordCloud.generate_from_frequencies``
+instead of re-tokenizing a concatenation of every matching review.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+import text_pipeline
+
+# Dropdown label -> column name in the text store
+WORDCLOUD_COLUMNS = {
+    "Pros": "pros",
+    "Cons": "cons",
+    "Advice to Management": "advice to Management",
+}
+
+def word_index_from_tokens(keys, token_matrices):
+    """Word counts per (Year, Country, column) from unigram token matrices.
+
+    `keys` holds the Year and Country columns, row-aligned with the rows
+    of every matrix in `token_matrices` ({column: TokenMatrix}).
+    """
+    index = {}
+    groups = keys.groupby(["Year", "Country"], observed=True).indices
+    for col, tokens in token_matrices.items():
+        for (year, country), idx in groups.items():
+            counts = tokens.term_counts(idx)
+            if len(counts):
+                index[(year, country, col)] = Counter(
+                    dict(zip(counts.index, counts.to_numpy().tolist()))
+                )
+    return index
+
+
+def build_word_index(keys, text, columns):
+    """Word counts per (Year, Country, column) of a free-text frame."""
+    return word_index_from_tokens(keys, {
+        col: text_pipeline.build_token_matrix(np.arange(len(text)), text[col])
+        for col in columns
+    })
+
+
+def merged_counts(index, year_range, country, column):
+    """Sum the cell counters that match the current filters."""
+    total = Counter()
+    for (year, c, col), counts in index.items():
+        if c == country and col == column and year_range[0] <= year <= year_range[1]:
+            total.update(counts)
+    return total
+
+
+def has_text(index, year_range, country, column):
+    """Whether any cell matching the filters has words."""
+    return any(
+        c == country and col == column and year_range[0] <= year <= year_range[1]
+        for year, c, col in index
+    )
+
+
+def merge_word_index(into, other):
+    """Fold the counts of `other` into `into` (in place) and return it."""
+    for key, counts in other.items():
+        into.setdefault(key, Counter()).update(counts)
+    return into